@@ -1,67 +1,95 @@
 from flask import Flask, render_template, request, jsonify, redirect, url_for, flash
-import sqlite3
+import click
+import logging
 import os
-from datetime import datetime
 from dotenv import load_dotenv
+from services import ai_jobs, connection, dates, importer, metrics, migrations, slowlog
+from services.cache import response_cache
+from services.conditional import conditional
+from services.connection import get_db
+from services.stats import get_event_stats
 
 # Load environment variables
 load_dotenv()
 
+logging.basicConfig(
+    level=os.getenv('LOG_LEVEL', 'INFO').upper(),
+    format='%(asctime)s %(levelname)s %(name)s: %(message)s'
+)
+
 # Initialize Flask app
 app = Flask(__name__)
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-secret-key-change-me')
 
 # Database file path
-DATABASE = 'data/events.db'
-
-def get_db_connection():
-    """Get database connection"""
-    os.makedirs('data', exist_ok=True)
-    conn = sqlite3.connect(DATABASE)
-    conn.row_factory = sqlite3.Row
-    return conn
+app.config['DATABASE'] = os.getenv('DATABASE_PATH', connection.DEFAULT_DATABASE)
+connection.init_app(app)
+metrics.init_app(app)
+slowlog.init_app(app)
+ai_jobs.init_app(app)
 
 def init_database():
-    """Initialize database with events table"""
-    conn = get_db_connection()
-    conn.execute('''
-        CREATE TABLE IF NOT EXISTS events (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            title TEXT NOT NULL,
-            description TEXT,
-            date TEXT NOT NULL,
-            location TEXT,
-            status TEXT DEFAULT 'upcoming',
-            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-            updated_at TEXT DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
-    conn.commit()
-    conn.close()
+    """Initialize database and apply pending schema migrations"""
+    conn = connection.connect(app.config['DATABASE'])
+    try:
+        return migrations.migrate(conn)
+    finally:
+        conn.close()
+
+@app.cli.command('init-db')
+def init_db_command():
+    """Create the schema and apply pending migrations"""
+    version = init_database()
+    print(f"Database at schema version {version}")
+
+@app.cli.command('check-indexes')
+def check_indexes_command():
+    """Fail if any hot route query scans the events table"""
+    conn = connection.connect(app.config['DATABASE'])
+    try:
+        problems = migrations.unindexed_queries(conn)
+    finally:
+        conn.close()
+    for name, plan in problems.items():
+        print(f"{name}: {' | '.join(plan)}")
+    if problems:
+        raise SystemExit(1)
+    print("All hot queries use an index")
+
+@app.cli.command('import-events')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'file_format', type=click.Choice(importer.FORMATS),
+              help='Defaults to the file extension')
+@click.option('--batch-size', default=importer.DEFAULT_BATCH_SIZE, show_default=True,
+              help='Rows per transaction')
+def import_events_command(path, file_format, batch_size):
+    """Stream events from a CSV or NDJSON file into the database"""
+    file_format = file_format or importer.detect_format(path)
+    if file_format is None:
+        raise click.UsageError('Cannot tell the format from the file name; pass --format')
+    conn = connection.connect(app.config['DATABASE'])
+    try:
+        with open(path, 'rb') as stream:
+            result = importer.import_events(conn, stream, file_format, max(1, batch_size))
+    finally:
+        conn.close()
+    for error in result['errors']:
+        print(f"line {error['line']}: {error['error']}")
+    print(f"Imported {result['imported']} events, rejected {result['rejected']}")
+    if result['rejected']:
+        raise SystemExit(1)
 
 def format_date(date_str):
     """Format date string for display"""
-    try:
-        dt = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-        return dt.strftime('%B %d, %Y at %I:%M %p')
-    except:
-        return date_str
+    return dates.format_date(date_str, dates.LONG_FORMAT)
 
 def short_date(date_str):
     """Short date format"""
-    try:
-        dt = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-        return dt.strftime('%m/%d/%Y %I:%M %p')
-    except:
-        return date_str
+    return dates.format_date(date_str, dates.SHORT_FORMAT)
 
 def is_past(date_str):
     """Check if date is in the past"""
-    try:
-        dt = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-        return dt < datetime.now()
-    except:
-        return False
+    return dates.is_past(date_str)
 
 def status_badge_class(status):
     """Get CSS class for status badge"""
@@ -87,9 +115,10 @@ app.register_blueprint(events_bp, url_prefix='/events')
 app.register_blueprint(search_bp, url_prefix='/search')
 
 @app.route('/')
+@conditional(page=True)
 def index():
     """Dashboard home page"""
-    conn = get_db_connection()
+    conn = get_db()
     
     # Get recent events
     recent_events = conn.execute('''
@@ -99,18 +128,20 @@ def index():
     ''').fetchall()
     
     # Get stats
-    total_events = conn.execute('SELECT COUNT(*) as count FROM events').fetchone()['count']
-    upcoming_events = conn.execute('''
-        SELECT COUNT(*) as count FROM events 
-        WHERE date >= datetime('now')
-    ''').fetchone()['count']
-    
-    conn.close()
+    stats = get_event_stats(conn)
     
     return render_template('index.html', 
                          recent_events=recent_events,
-                         total_events=total_events,
-                         upcoming_events=upcoming_events)
+                         total_events=stats['total'],
+                         upcoming_events=stats['upcoming'])
+
+@app.route('/api/cache-stats')
+def cache_stats_api():
+    """Hit/miss counters for the API response cache"""
+    return jsonify({
+        'success': True,
+        'cache': response_cache.stats()
+    })
 
 if __name__ == '__main__':
     # Initialize database before running the app
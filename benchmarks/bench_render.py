@@ -0,0 +1,118 @@
+"""Render benchmark for the events list with the date filters
+
+    $ python -m benchmarks.bench_render [--rows N] [--repeat N] [--json]
+
+Renders templates/events.html over N synthetic rows with the current
+filters (services/dates.py) and with the legacy per-call parsing ones,
+and exits non-zero if the two renders differ.
+"""
+import argparse
+import json
+import sys
+import time
+from datetime import datetime, timedelta
+
+from app import app
+from benchmarks import legacy_filters
+from services import dates
+from services.pagination import KeysetPage
+
+STATUSES = ('upcoming', 'attending', 'maybe', 'declined')
+
+
+def make_rows(count, start=datetime(2024, 1, 1, 9, 0)):
+    """Synthetic event rows, half in the past, half in the future"""
+    start = min(start, datetime.now() - timedelta(hours=count // 2))
+    return [{
+        'id': i,
+        'title': f'Event {i}',
+        'description': f'Description for event {i}',
+        'date': (start + timedelta(hours=i)).isoformat(),
+        'location': f'Room {i % 40}',
+        'status': STATUSES[i % len(STATUSES)],
+        'created_at': '2024-01-01 00:00:00',
+        'updated_at': '2024-01-01 00:00:00',
+    } for i in range(count)]
+
+
+def time_filters(filters, rows, repeat):
+    """Best ms for the filter calls events.html makes per row, template excluded"""
+    format_date, is_past = filters['format_date'], filters['is_past']
+    best = None
+    for _ in range(repeat):
+        with app.test_request_context('/events/'):
+            started = time.perf_counter()
+            for row in rows:
+                format_date(row['date'])
+                format_date(row['date'])
+                is_past(row['date'])
+            elapsed = (time.perf_counter() - started) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def time_render(template, page, repeat):
+    """(first render ms, best warm render ms, html)"""
+    timings = []
+    html = None
+    for _ in range(repeat + 1):
+        with app.test_request_context('/events/'):
+            started = time.perf_counter()
+            html = template.render(events=page, current_status='')
+            timings.append((time.perf_counter() - started) * 1000)
+    return timings[0], min(timings[1:]), html
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--json', action='store_true', help='print machine-readable results')
+    args = parser.parse_args(argv)
+
+    page = KeysetPage(make_rows(args.rows), has_prev=False, has_next=False, per_page=args.rows)
+
+    legacy_env = app.jinja_env.overlay(cache_size=50)
+    legacy_env.filters = dict(
+        app.jinja_env.filters,
+        format_date=legacy_filters.format_date,
+        short_date=legacy_filters.short_date,
+        is_past=legacy_filters.is_past,
+    )
+    with app.app_context():
+        current = app.jinja_env.get_template('events.html')
+        legacy = legacy_env.get_template('events.html')
+
+    dates.parse_date.cache_clear()
+    dates.format_date.cache_clear()
+    current_cold, current_warm, current_html = time_render(current, page, args.repeat)
+    legacy_cold, legacy_warm, legacy_html = time_render(legacy, page, args.repeat)
+
+    current_filters = time_filters(app.jinja_env.filters, page.items, args.repeat)
+    legacy_filters_ms = time_filters(legacy_env.filters, page.items, args.repeat)
+
+    results = {
+        'benchmark': 'render_events',
+        'rows': args.rows,
+        'identical_output': current_html == legacy_html,
+        'current_cold_ms': round(current_cold, 1),
+        'current_warm_ms': round(current_warm, 1),
+        'legacy_cold_ms': round(legacy_cold, 1),
+        'legacy_warm_ms': round(legacy_warm, 1),
+        'current_filters_ms': round(current_filters, 1),
+        'legacy_filters_ms': round(legacy_filters_ms, 1),
+        'date_cache': dates.parse_date.cache_info()._asdict(),
+    }
+
+    if args.json:
+        print(json.dumps(results))
+    else:
+        print(f"rows: {args.rows}, identical output: {results['identical_output']}")
+        print(f"current: {current_cold:.1f} ms first render, {current_warm:.1f} ms best warm")
+        print(f"legacy:  {legacy_cold:.1f} ms first render, {legacy_warm:.1f} ms best warm")
+        print(f"filters alone: {current_filters:.1f} ms current, {legacy_filters_ms:.1f} ms legacy")
+    return 0 if results['identical_output'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,287 @@
+"""Latency and throughput of every route on seeded databases
+
+    $ python -m benchmarks.bench_routes [--sizes 1k,100k,1M] [--requests N]
+          [--workers N] [--duration S] [--output results.json]
+
+For each size a seeded database is built once under --data-dir (reused
+while its row count matches) and copied to a separate file for each run,
+so add, edit and delete never leak between runs. Each route is first driven alone
+through the Flask test client, then a weighted mix runs in --workers
+processes for --duration seconds against the same database file.
+Prints one JSON document with p50/p95/p99 latency, throughput and peak
+RSS, to diff between commits.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import random
+import resource
+import shutil
+import sqlite3
+import subprocess
+import sys
+import time
+
+from app import app
+from benchmarks.datagen import ACTIVITIES, PLACES, TOPICS, seed_database
+from services import ai_jobs, connection
+from services.cache import response_cache
+from services.suggestions import suggestion_index
+from services.writer import shutdown_write_queues
+
+SIZES = {'1k': 1000, '10k': 10000, '100k': 100000, '1M': 1000000}
+STATUSES = ('upcoming', 'attending', 'maybe', 'declined')
+
+
+class RouteContext:
+    """Per-process state the scenarios draw ids and words from
+
+    Reads and edits stay in the lower half of the seeded ids; deletes walk
+    down from the top, striped by worker, so no two workers delete the
+    same row and no read targets a deleted one.
+    """
+
+    def __init__(self, size, worker=0, workers=1, seed=0):
+        self.rng = random.Random(seed + worker)
+        self.size = size
+        self.next_delete = size - worker
+        self.delete_step = workers
+        self.words = [word for phrase in ACTIVITIES + TOPICS for word in phrase.lower().split()
+                      if len(word) > 3]
+        self.places = [place for place in PLACES if place]
+
+    def read_id(self):
+        return self.rng.randint(1, max(1, self.size // 2))
+
+    def delete_id(self):
+        event_id = self.next_delete
+        self.next_delete -= self.delete_step
+        return event_id
+
+    def form(self):
+        rng = self.rng
+        return {
+            'title': f'{rng.choice(ACTIVITIES)} {rng.randint(1, 999)}',
+            'description': 'Benchmark event',
+            'date': f'2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T{rng.randint(8, 20):02d}:00',
+            'location': rng.choice(self.places),
+            'status': rng.choice(STATUSES),
+        }
+
+
+# name -> (weight in the load mix, expected status, request). Form posts
+# redirect whether or not they worked, so _call also checks their flashes.
+SCENARIOS = {
+    'index': (10, 200, lambda client, ctx: client.get('/')),
+    'events.list_events': (15, 200, lambda client, ctx: client.get(
+        '/events/' + (f'?status={ctx.rng.choice(STATUSES)}' if ctx.rng.random() < 0.3 else ''))),
+    'search.search_page': (10, 200, lambda client, ctx: client.get('/search/', query_string={
+        'q': ctx.rng.choice(ctx.words),
+        'status': ctx.rng.choice(('',) + STATUSES),
+    })),
+    'search.quick_search_api': (25, 200, lambda client, ctx: client.get(
+        '/search/api/quick-search', query_string={'q': ctx.rng.choice(ctx.words)[:ctx.rng.randint(3, 6)]})),
+    'search.search_suggestions_api': (20, 200, lambda client, ctx: client.get(
+        '/search/api/suggestions', query_string={'q': ctx.rng.choice(ctx.words)[:ctx.rng.randint(2, 4)]})),
+    'events.get_event_api': (15, 200, lambda client, ctx: client.get(f'/events/api/{ctx.read_id()}')),
+    'events.add_event': (2, 302, lambda client, ctx: client.post('/events/add', data=ctx.form())),
+    'events.edit_event': (2, 302, lambda client, ctx: client.post(
+        f'/events/edit/{ctx.read_id()}', data=ctx.form())),
+    'events.delete_event': (1, 302, lambda client, ctx: client.post(f'/events/delete/{ctx.delete_id()}')),
+}
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies, errors, elapsed):
+    """Latency percentiles in ms plus throughput for one route or mix"""
+    values = sorted(latencies)
+    return {
+        'requests': len(values),
+        'errors': errors,
+        'p50_ms': round(percentile(values, 50) * 1000, 3) if values else None,
+        'p95_ms': round(percentile(values, 95) * 1000, 3) if values else None,
+        'p99_ms': round(percentile(values, 99) * 1000, 3) if values else None,
+        'max_ms': round(values[-1] * 1000, 3) if values else None,
+        'throughput_rps': round(len(values) / elapsed, 1) if elapsed else None,
+    }
+
+
+def _call(scenario, expected, client, ctx):
+    """(seconds, ok) for one request
+
+    ok means the expected status and, for a redirect, nothing but success
+    flashed: failed validation, a missing event and a write error all
+    redirect too.
+    """
+    started = time.perf_counter()
+    response = scenario(client, ctx)
+    elapsed = time.perf_counter() - started
+    ok = response.status_code == expected
+    if ok and response.status_code == 302:
+        with client.session_transaction() as session:
+            ok = all(category == 'success' for category, _ in session.pop('_flashes', []))
+    return elapsed, ok
+
+
+def _peak_rss_mb(who=resource.RUSAGE_SELF):
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(who).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def run_sequential(database, size, requests):
+    """Drive each route on its own, one request at a time"""
+    app.config['DATABASE'] = database
+    # Process-wide state built from the previous size's database
+    suggestion_index.reset()
+    response_cache.invalidate()
+    ctx = RouteContext(size)
+    client = app.test_client()
+    routes = {}
+    for name, (_, expected, scenario) in SCENARIOS.items():
+        _call(scenario, expected, client, ctx)  # warm caches and compiled templates
+        latencies, errors = [], 0
+        started = time.perf_counter()
+        for _ in range(requests):
+            elapsed, ok = _call(scenario, expected, client, ctx)
+            latencies.append(elapsed)
+            errors += not ok
+        routes[name] = summarize(latencies, errors, time.perf_counter() - started)
+    connection.close_thread_connections()
+    # The AI job workers and the writer keep connections open on the working copy
+    ai_jobs.stop_workers()
+    shutdown_write_queues()
+    return {'routes': routes, 'peak_rss_mb': _peak_rss_mb()}
+
+
+def _load_worker(database, size, worker, workers, duration, seed):
+    app.config['DATABASE'] = database
+    ctx = RouteContext(size, worker, workers, seed)
+    client = app.test_client()
+    names = list(SCENARIOS)
+    weights = [SCENARIOS[name][0] for name in names]
+    latencies = {name: [] for name in names}
+    errors = {name: 0 for name in names}
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        name = ctx.rng.choices(names, weights)[0]
+        _, expected, scenario = SCENARIOS[name]
+        elapsed, ok = _call(scenario, expected, client, ctx)
+        latencies[name].append(elapsed)
+        errors[name] += not ok
+    return latencies, errors
+
+
+def run_load(database, size, workers, duration, seed=0):
+    """Weighted route mix in worker processes sharing one database"""
+    method = 'fork' if 'fork' in multiprocessing.get_all_start_methods() else 'spawn'
+    with multiprocessing.get_context(method).Pool(workers) as pool:
+        started = time.perf_counter()
+        outcomes = pool.starmap(_load_worker, [
+            (database, size, worker, workers, duration, seed) for worker in range(workers)
+        ])
+        elapsed = time.perf_counter() - started
+
+    routes = {}
+    everything, total_errors = [], 0
+    for name in SCENARIOS:
+        latencies = [value for outcome in outcomes for value in outcome[0][name]]
+        errors = sum(outcome[1][name] for outcome in outcomes)
+        routes[name] = summarize(latencies, errors, elapsed)
+        everything.extend(latencies)
+        total_errors += errors
+    return {
+        'workers': workers,
+        'duration_s': round(elapsed, 2),
+        'overall': summarize(everything, total_errors, elapsed),
+        'routes': routes,
+        'peak_rss_mb': _peak_rss_mb(resource.RUSAGE_CHILDREN),
+    }
+
+
+def seeded_database(data_dir, label, count):
+    """Path of a seeded database for this size, built if missing or stale"""
+    path = os.path.join(data_dir, f'events-{label}.db')
+    if os.path.exists(path):
+        conn = sqlite3.connect(path)
+        try:
+            if conn.execute('SELECT COUNT(*) FROM events').fetchone()[0] == count:
+                return path
+        except sqlite3.Error:
+            pass
+        finally:
+            conn.close()
+    os.makedirs(data_dir, exist_ok=True)
+    return seed_database(path, count)
+
+
+def _working_copy(seeded, phase):
+    """A fresh copy of the seeded database, one file per phase"""
+    working = seeded.replace('.db', f'.{phase}.db')
+    for suffix in ('-wal', '-shm'):
+        if os.path.exists(working + suffix):
+            os.remove(working + suffix)
+    shutil.copyfile(seeded, working)
+    return working
+
+
+def _commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='1k,100k,1M', help=f"comma separated, from {', '.join(SIZES)}")
+    parser.add_argument('--requests', type=int, default=200, help='requests per route, sequential run')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 2)
+    parser.add_argument('--duration', type=float, default=10.0, help='seconds of mixed load')
+    parser.add_argument('--data-dir', default='data/bench')
+    parser.add_argument('--output', help='write JSON here instead of stdout')
+    args = parser.parse_args(argv)
+
+    report = {
+        'benchmark': 'routes',
+        'commit': _commit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'config': {'requests': args.requests, 'workers': args.workers, 'duration_s': args.duration},
+        'results': [],
+    }
+    for label in args.sizes.split(','):
+        label = label.strip()
+        if label not in SIZES:
+            parser.error(f'unknown size {label!r}')
+        count = SIZES[label]
+        seeded = seeded_database(args.data_dir, label, count)
+        result = {'size': label, 'events': count}
+        result['sequential'] = run_sequential(_working_copy(seeded, 'sequential'), count, args.requests)
+        if args.workers > 0 and args.duration > 0:
+            result['load'] = run_load(_working_copy(seeded, 'load'), count, args.workers, args.duration)
+        report['results'].append(result)
+        print(f"{label}: done", file=sys.stderr)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,84 @@
+"""Microbenchmark for the offline event parser against the old regex parser
+
+    $ python -m benchmarks.bench_simple_parse [--rounds N] [--json]
+
+Correctness is covered by the golden corpus in tests/test_nl_parser.py.
+"""
+import argparse
+import contextlib
+import json
+import sys
+import timeit
+
+from benchmarks.legacy_parse import legacy_simple_parse
+from services.nl_parser import parse_event_text
+
+# A mix of the shapes users type: times, weekdays, locations and plain titles
+INPUTS = (
+    "Team meeting tomorrow at 3pm in conference room A",
+    "Lunch with Sarah at Cafe Roma on Friday at 1pm",
+    "Dinner at 7 in Seattle",
+    "Saturday hike at Mount Si",
+    "Seattle trip next Monday",
+    "Standup at 14:30",
+    "Party tonight @ Joe's place",
+    "Review on 2024-07-01 at 10:30 am",
+    "Dentist next week",
+    "Concert next Friday at 8 p.m. at the Paramount",
+    "Book club Thursday at 6:30pm at Elliott Bay Books",
+    "Birthday party",
+    "Planning for next quarter",
+    "Meeting 25:00",
+)
+
+
+class _NullWriter:
+    """Discarding stdout, so the legacy parser's prints cost only formatting"""
+
+    def write(self, text):
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+def time_parser(parse, inputs, rounds, repeat=5):
+    """Best-of-repeat mean microseconds per parse over rounds passes"""
+    def run():
+        for text in inputs:
+            parse(text)
+
+    with contextlib.redirect_stdout(_NullWriter()):
+        best = min(timeit.repeat(run, number=rounds, repeat=repeat))
+    return best / (rounds * len(inputs)) * 1e6
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rounds', type=int, default=1000)
+    parser.add_argument('--json', action='store_true', help='print machine-readable results')
+    args = parser.parse_args(argv)
+
+    results = {
+        'benchmark': 'simple_parse',
+        'inputs': len(INPUTS),
+        'rounds': args.rounds,
+        'tokenizer_us': round(time_parser(parse_event_text, INPUTS, args.rounds), 3),
+        'legacy_us': round(time_parser(legacy_simple_parse, INPUTS, args.rounds), 3),
+    }
+    results['speedup'] = round(results['legacy_us'] / results['tokenizer_us'], 2)
+
+    if args.json:
+        print(json.dumps(results))
+    else:
+        print(f"tokenizer: {results['tokenizer_us']:.2f} us/parse")
+        print(f"legacy:    {results['legacy_us']:.2f} us/parse")
+        if results['tokenizer_us'] <= results['legacy_us']:
+            print(f"tokenizer is {results['speedup']:.2f}x faster")
+        else:
+            print(f"tokenizer is {results['tokenizer_us'] / results['legacy_us']:.2f}x slower")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,28 @@
+# Verbatim copies of the app.py date filters before services/dates.py,
+# kept only as the baseline for bench_render.
+from datetime import datetime
+
+
+def format_date(date_str):
+    """Format date string for display"""
+    try:
+        dt = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
+        return dt.strftime('%B %d, %Y at %I:%M %p')
+    except:
+        return date_str
+
+def short_date(date_str):
+    """Short date format"""
+    try:
+        dt = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
+        return dt.strftime('%m/%d/%Y %I:%M %p')
+    except:
+        return date_str
+
+def is_past(date_str):
+    """Check if date is in the past"""
+    try:
+        dt = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
+        return dt < datetime.now()
+    except:
+        return False
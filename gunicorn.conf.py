@@ -0,0 +1,30 @@
+"""Gunicorn settings; every value can be overridden from the environment"""
+import os
+
+
+def _cpu_count():
+    try:
+        # CPUs this container may actually run on, not the host's total
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+
+# Load the app (migrations and warm-up in wsgi.py) once in the master
+preload_app = True
+
+# One process per CPU; threads overlap requests waiting on the AI API or
+# the writer thread. Every process keeps its own SQLite connections.
+workers = int(os.getenv('WEB_CONCURRENCY', max(2, _cpu_count())))
+threads = int(os.getenv('GUNICORN_THREADS', 4))
+worker_class = 'gthread'
+
+# Long enough for an AI call with retries
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 60))
+graceful_timeout = 30
+keepalive = 5
+
+accesslog = '-'
+loglevel = os.getenv('LOG_LEVEL', 'info').lower()
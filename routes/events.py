@@ -1,55 +1,96 @@
-from flask import Blueprint, render_template, request, jsonify, redirect, url_for, flash
-from datetime import datetime
-import sqlite3
-import os
+import math
+from flask import Blueprint, Response, render_template, request, jsonify, redirect, url_for, flash, current_app, stream_with_context
+from services import ai_jobs
+from services.batch import MAX_OPERATIONS, BatchRejected, apply_index_changes, apply_operations
+from services.bulk_enhance import DEFAULT_RATE, DEFAULT_WORKERS, MAX_EVENT_IDS, get_job, start_bulk_enhance
+from services.cache import MISSING, response_cache
+from services.conditional import conditional
+from services.connection import get_db
+from services.exporter import csv_chunks, ndjson_chunks
+from services.filters import event_filters
+from services.importer import DEFAULT_BATCH_SIZE, FORMATS, MAX_UPLOAD_BYTES, detect_format, import_events
+from services.pagination import DEFAULT_PER_PAGE, paginate_events
+from services.stats import count_events, get_event_stats
+from services.suggestions import suggestion_index
+from services.validation import validate_event
+from services.writer import get_write_queue
 
 events_bp = Blueprint('events', __name__)
 
-def get_db_connection():
-    """Get database connection"""
-    os.makedirs('data', exist_ok=True)
-    conn = sqlite3.connect('data/events.db')
-    conn.row_factory = sqlite3.Row
-    return conn
+INSERT_EVENT_SQL = '''
+    INSERT INTO events (title, description, date, location, status)
+    VALUES (?, ?, ?, ?, ?)
+'''
 
 @events_bp.route('/')
+@conditional(page=True)
 def list_events():
-    """List all events with filtering"""
+    """List events with status filtering and cursor pagination"""
     status_filter = request.args.get('status', '')
+    cursor = request.args.get('cursor', '')
+    per_page = request.args.get('per_page', DEFAULT_PER_PAGE, type=int)
     
-    conn = get_db_connection()
+    conn = get_db()
     
-    if status_filter:
-        events = conn.execute('''
-            SELECT * FROM events 
-            WHERE status = ? 
-            ORDER BY date DESC
-        ''', (status_filter,)).fetchall()
-    else:
-        events = conn.execute('''
-            SELECT * FROM events 
-            ORDER BY date DESC
-        ''').fetchall()
-    
-    conn.close()
-    
-    # Mock pagination object for template compatibility
-    class MockPagination:
-        def __init__(self, items):
-            self.items = items
-            self.has_prev = False
-            self.has_next = False
-            self.prev_num = None
-            self.next_num = None
-            self.page = 1
-            self.pages = 1
-    
-    events_paginated = MockPagination(events)
+    try:
+        events_page = paginate_events(conn, status_filter, cursor, per_page)
+    except ValueError:
+        # Stale or tampered cursor - start again from the first page
+        events_page = paginate_events(conn, status_filter, None, per_page)
     
     return render_template('events.html', 
-                         events=events_paginated, 
+                         events=events_page, 
+                         total_events=count_events(conn, status_filter),
                          current_status=status_filter)
 
+@events_bp.route('/api')
+@conditional()
+def list_events_api():
+    """API endpoint to list events one cursor page at a time"""
+    status_filter = request.args.get('status', '')
+    cursor = request.args.get('cursor', '')
+    per_page = request.args.get('per_page', DEFAULT_PER_PAGE, type=int)
+    
+    try:
+        events_page = paginate_events(get_db(), status_filter, cursor, per_page)
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    
+    return jsonify({
+        'success': True,
+        'events': [dict(row) for row in events_page.items],
+        'has_prev': events_page.has_prev,
+        'has_next': events_page.has_next,
+        'prev_cursor': events_page.prev_cursor,
+        'next_cursor': events_page.next_cursor
+    })
+
+def _export_response(chunks, mimetype, filename):
+    """Stream an export filtered like the search page"""
+    sql_parts, params = event_filters(
+        request.args.get('status', ''),
+        request.args.get('date_from', ''),
+        request.args.get('date_to', '')
+    )
+    return Response(
+        stream_with_context(chunks(get_db(), sql_parts, params)),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
+
+@events_bp.route('/export.ndjson')
+def export_ndjson():
+    """Stream every matching event as newline-delimited JSON"""
+    return _export_response(ndjson_chunks, 'application/x-ndjson', 'events.ndjson')
+
+@events_bp.route('/export.csv')
+def export_csv():
+    """Stream every matching event as CSV"""
+    return _export_response(csv_chunks, 'text/csv', 'events.csv')
+
 @events_bp.route('/add', methods=['GET', 'POST'])
 def add_event():
     """Add new event"""
@@ -58,77 +99,29 @@ def add_event():
         ai_input = request.form.get('ai_input', '').strip()
         
         if ai_input:
-            # Simple AI simulation (you can add OpenAI integration later)
+            # Parsed and inserted by the AI job workers; the events page
+            # polls the job and reports the outcome
             try:
-                # Import AI service
-                from services.ai_service import AIService
-                ai_service = AIService()
-                ai_result = ai_service.parse_natural_language_event(ai_input)
-                
-                if ai_result['success']:
-                    event_data = ai_result['event_data']
-                    
-                    if event_data.get('needs_clarification'):
-                        flash(f"Need clarification: {event_data.get('clarification_message')}", 'warning')
-                        return render_template('add_event.html', ai_input=ai_input)
-                    
-                    # Create event from AI-parsed data
-                    conn = get_db_connection()
-                    conn.execute('''
-                        INSERT INTO events (title, description, date, location, status)
-                        VALUES (?, ?, ?, ?, ?)
-                    ''', (
-                        event_data['title'],
-                        event_data.get('description'),
-                        event_data['date'].isoformat() if isinstance(event_data['date'], datetime) else event_data['date'],
-                        event_data.get('location'),
-                        event_data.get('status', 'upcoming')
-                    ))
-                    conn.commit()
-                    conn.close()
-                    
-                    flash(f'Event "{event_data["title"]}" created successfully using AI!', 'success')
-                    return redirect(url_for('events.list_events'))
-                else:
-                    flash(f'AI parsing failed: {ai_result.get("error", "Unknown error")}', 'error')
-                    return render_template('add_event.html', ai_input=ai_input)
+                job_id = ai_jobs.submit_job(ai_input)
             except Exception as e:
-                flash(f'AI service error: {str(e)}', 'warning')
-                # Fall back to manual form
-                pass
+                # Keep the text so it can be resubmitted or typed in by hand
+                flash(f'Could not queue your event: {str(e)}', 'error')
+                return render_template('add_event.html', ai_input=ai_input)
+            flash('Creating your event with AI...', 'info')
+            return redirect(url_for('events.list_events', ai_job=job_id))
         
         # Traditional form input
-        title = request.form.get('title', '').strip()
-        description = request.form.get('description', '').strip()
-        date_str = request.form.get('date', '').strip()
-        location = request.form.get('location', '').strip()
-        status = request.form.get('status', 'upcoming')
-        
-        # Validate required fields
-        if not title:
-            flash('Event title is required', 'error')
-            return render_template('add_event.html')
-        
-        if not date_str:
-            flash('Event date is required', 'error')
-            return render_template('add_event.html')
-        
-        # Parse date
         try:
-            event_date = datetime.strptime(date_str, '%Y-%m-%dT%H:%M')
-        except ValueError:
-            flash('Invalid date format', 'error')
+            values = validate_event(request.form)
+        except ValueError as e:
+            flash(str(e), 'error')
             return render_template('add_event.html')
+        title, location = values[0], values[3]
         
         # Create event
         try:
-            conn = get_db_connection()
-            conn.execute('''
-                INSERT INTO events (title, description, date, location, status)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (title, description or None, event_date.isoformat(), location or None, status))
-            conn.commit()
-            conn.close()
+            get_write_queue().execute(INSERT_EVENT_SQL, values)
+            suggestion_index.add_event(title, location)
             
             flash(f'Event "{title}" created successfully!', 'success')
             return redirect(url_for('events.list_events'))
@@ -141,7 +134,7 @@ def add_event():
 @events_bp.route('/edit/<int:event_id>', methods=['GET', 'POST'])
 def edit_event(event_id):
     """Edit existing event"""
-    conn = get_db_connection()
+    conn = get_db()
     event = conn.execute('SELECT * FROM events WHERE id = ?', (event_id,)).fetchone()
     
     if not event:
@@ -149,37 +142,21 @@ def edit_event(event_id):
         return redirect(url_for('events.list_events'))
     
     if request.method == 'POST':
-        title = request.form.get('title', '').strip()
-        description = request.form.get('description', '').strip()
-        date_str = request.form.get('date', '').strip()
-        location = request.form.get('location', '').strip()
-        status = request.form.get('status', 'upcoming')
-        
-        # Validate required fields
-        if not title:
-            flash('Event title is required', 'error')
-            return render_template('add_event.html', event=event, edit_mode=True)
-        
-        if not date_str:
-            flash('Event date is required', 'error')
-            return render_template('add_event.html', event=event, edit_mode=True)
-        
-        # Parse date
         try:
-            event_date = datetime.strptime(date_str, '%Y-%m-%dT%H:%M')
-        except ValueError:
-            flash('Invalid date format', 'error')
+            values = validate_event(request.form)
+        except ValueError as e:
+            flash(str(e), 'error')
             return render_template('add_event.html', event=event, edit_mode=True)
+        title, location = values[0], values[3]
         
         # Update event
         try:
-            conn.execute('''
+            get_write_queue().execute('''
                 UPDATE events 
                 SET title = ?, description = ?, date = ?, location = ?, status = ?, updated_at = CURRENT_TIMESTAMP
                 WHERE id = ?
-            ''', (title, description or None, event_date.isoformat(), location or None, status, event_id))
-            conn.commit()
-            conn.close()
+            ''', values + (event_id,))
+            suggestion_index.update_event(event['title'], event['location'], title, location)
             
             flash(f'Event "{title}" updated successfully!', 'success')
             return redirect(url_for('events.list_events'))
@@ -187,42 +164,153 @@ def edit_event(event_id):
         except Exception as e:
             flash(f'Error updating event: {str(e)}', 'error')
     
-    conn.close()
     return render_template('add_event.html', event=event, edit_mode=True)
 
 @events_bp.route('/delete/<int:event_id>', methods=['POST'])
 def delete_event(event_id):
     """Delete event"""
+    def delete(conn):
+        return conn.execute(
+            'DELETE FROM events WHERE id = ? RETURNING title, location', (event_id,)
+        ).fetchone()
+    
     try:
-        conn = get_db_connection()
-        event = conn.execute('SELECT title FROM events WHERE id = ?', (event_id,)).fetchone()
+        event = get_write_queue().submit(delete)
         
         if event:
             event_title = event['title']
-            conn.execute('DELETE FROM events WHERE id = ?', (event_id,))
-            conn.commit()
+            suggestion_index.remove_event(event_title, event['location'])
             flash(f'Event "{event_title}" deleted successfully!', 'success')
         else:
             flash('Event not found', 'error')
-        
-        conn.close()
     except Exception as e:
         flash(f'Error deleting event: {str(e)}', 'error')
     
     return redirect(url_for('events.list_events'))
 
+@events_bp.route('/api/import', methods=['POST'])
+def import_events_api():
+    """API endpoint to bulk import events from a CSV or NDJSON upload
+    
+    Accepts a multipart `file` field or the raw request body. The format
+    comes from `?format=`, the file name or the content type.
+    """
+    # The import runs inside the request, so its size is capped up front
+    if request.content_length is None:
+        return jsonify({
+            'success': False,
+            'error': 'Content-Length is required'
+        }), 411
+    if request.content_length > MAX_UPLOAD_BYTES:
+        return jsonify({
+            'success': False,
+            'error': f'Upload is larger than {MAX_UPLOAD_BYTES} bytes; use flask import-events'
+        }), 413
+    
+    upload = request.files.get('file')
+    if upload:
+        stream = upload.stream
+        file_format = request.args.get('format') or detect_format(upload.filename, upload.content_type)
+    else:
+        stream = request.stream
+        file_format = request.args.get('format') or detect_format(content_type=request.content_type)
+    
+    if file_format not in FORMATS:
+        return jsonify({
+            'success': False,
+            'error': 'Upload a .csv or .ndjson file or pass ?format=csv|ndjson'
+        }), 400
+    
+    batch_size = request.args.get('batch_size', DEFAULT_BATCH_SIZE, type=int)
+    try:
+        result = import_events(get_db(), stream, file_format, max(1, batch_size))
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+    
+    return jsonify({
+        'success': True,
+        **result
+    })
+
+@events_bp.route('/api/batch', methods=['POST'])
+def batch_events_api():
+    """API endpoint to create, update, re-status and delete events in one transaction
+    
+    Body: {"operations": [{"op": "create", "event": {...}},
+    {"op": "update", "id": 1, "event": {...}}, {"op": "status", "ids": [1, 2],
+    "status": "attending"}, {"op": "delete", "ids": [3]}], "atomic": true}
+    """
+    data = request.get_json(silent=True)
+    operations = data.get('operations') if isinstance(data, dict) else None
+    
+    if not isinstance(operations, list) or not 1 <= len(operations) <= MAX_OPERATIONS:
+        return jsonify({
+            'success': False,
+            'error': f'operations must be a list of 1-{MAX_OPERATIONS} items'
+        }), 400
+    
+    atomic = data.get('atomic', True) is not False
+    try:
+        results, index_changes = get_write_queue().submit(
+            lambda conn: apply_operations(conn, operations, atomic)
+        )
+    except BatchRejected as e:
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'results': e.results
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+    
+    apply_index_changes(index_changes)
+    failed = sum(1 for result in results if not result['success'])
+    return jsonify({
+        'success': failed == 0,
+        'applied': len(results) - failed,
+        'failed': failed,
+        'results': results
+    })
+
+@events_bp.route('/api/stats')
+def event_stats_api():
+    """API endpoint for event totals, upcoming/past and per-status counts"""
+    try:
+        return jsonify({
+            'success': True,
+            'stats': get_event_stats(get_db())
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
 @events_bp.route('/api/<int:event_id>')
+@conditional()
 def get_event_api(event_id):
     """API endpoint to get single event"""
     try:
-        conn = get_db_connection()
-        event = conn.execute('SELECT * FROM events WHERE id = ?', (event_id,)).fetchone()
-        conn.close()
+        conn = get_db()
+        key = ('event', event_id)
+        version = response_cache.version(conn)
+        event = response_cache.get(key, version)
+        if event is MISSING:
+            row = conn.execute('SELECT * FROM events WHERE id = ?', (event_id,)).fetchone()
+            event = dict(row) if row else None
+            if event:
+                response_cache.set(key, version, event)
         
         if event:
             return jsonify({
                 'success': True,
-                'event': dict(event)
+                'event': event
             })
         else:
             return jsonify({
@@ -249,9 +337,11 @@ def enhance_description_api():
         }), 400
     
     try:
-        from services.ai_service import AIService
-        ai_service = AIService()
-        enhanced_description = ai_service.enhance_event_description(title, location)
+        from services.ai_service import get_ai_service
+        ai_service = get_ai_service()
+        enhanced_description = ai_service.enhance_event_description(
+            title, location, budget=ai_service.request_budget
+        )
         return jsonify({
             'success': True,
             'description': enhanced_description
@@ -265,4 +355,113 @@ def enhance_description_api():
         return jsonify({
             'success': True,
             'description': description
-        })
\ No newline at end of file
+        })
+
+@events_bp.route('/api/ai-jobs', methods=['POST'])
+def submit_ai_job_api():
+    """API endpoint to queue natural-language text for event creation"""
+    data = request.get_json(silent=True)
+    text = data.get('text') if isinstance(data, dict) else None
+    
+    if not isinstance(text, str) or not text.strip():
+        return jsonify({
+            'success': False,
+            'error': 'text is required'
+        }), 400
+    
+    try:
+        job_id = ai_jobs.submit_job(text.strip())
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'Could not queue the job: {str(e)}'
+        }), 503
+    
+    return jsonify({
+        'success': True,
+        'job': ai_jobs.get_job(get_db(), job_id),
+        'status_url': url_for('events.ai_job_status_api', job_id=job_id)
+    }), 202
+
+@events_bp.route('/api/ai-jobs/<job_id>')
+def ai_job_status_api(job_id):
+    """API endpoint for an AI job's status; ?wait=N long-polls up to N seconds"""
+    wait = request.args.get('wait', 0, type=float)
+    if not math.isfinite(wait):
+        return jsonify({
+            'success': False,
+            'error': 'wait must be a number of seconds'
+        }), 400
+    
+    job = ai_jobs.wait_for_job(get_db(), job_id, wait)
+    if not job:
+        return jsonify({
+            'success': False,
+            'error': 'Job not found'
+        }), 404
+    
+    return jsonify({
+        'success': True,
+        'job': job
+    })
+
+@events_bp.route('/api/enhance-descriptions', methods=['POST'])
+def bulk_enhance_api():
+    """API endpoint to enhance many descriptions in the background"""
+    data = request.get_json(silent=True) or {}
+    event_ids = data.get('event_ids')
+    
+    if event_ids is not None and (
+            not isinstance(event_ids, list) or len(event_ids) > MAX_EVENT_IDS
+            or not all(isinstance(i, int) for i in event_ids)):
+        return jsonify({
+            'success': False,
+            'error': f'event_ids must be a list of at most {MAX_EVENT_IDS} integers'
+        }), 400
+    
+    workers = data.get('workers', DEFAULT_WORKERS)
+    rate = data.get('rate', DEFAULT_RATE)
+    if (isinstance(workers, bool) or not isinstance(workers, int) or workers <= 0
+            or isinstance(rate, bool) or not isinstance(rate, (int, float))
+            or not 0 < rate < float('inf')):
+        return jsonify({
+            'success': False,
+            'error': 'workers must be a positive integer and rate a positive number'
+        }), 400
+    
+    from services.ai_service import get_ai_service
+    ai_service = get_ai_service()
+    if not ai_service.available:
+        return jsonify({
+            'success': False,
+            'error': 'AI service is not configured'
+        }), 503
+    
+    job = start_bulk_enhance(
+        current_app.config['DATABASE'],
+        ai_service,
+        event_ids=event_ids,
+        workers=workers,
+        rate=float(rate)
+    )
+    
+    return jsonify({
+        'success': True,
+        'job': job.to_dict(),
+        'status_url': url_for('events.bulk_enhance_status_api', job_id=job.id)
+    }), 202
+
+@events_bp.route('/api/enhance-descriptions/<job_id>')
+def bulk_enhance_status_api(job_id):
+    """API endpoint for bulk enhancement progress"""
+    job = get_job(get_db(), job_id)
+    if not job:
+        return jsonify({
+            'success': False,
+            'error': 'Job not found'
+        }), 404
+    
+    return jsonify({
+        'success': True,
+        'job': job
+    })
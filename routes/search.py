@@ -1,18 +1,18 @@
 from flask import Blueprint, render_template, request, jsonify
-from datetime import datetime
-import sqlite3
-import os
+from services import fulltext
+from services.cache import MISSING, response_cache
+from services.conditional import conditional
+from services.connection import get_db
+from services.filters import event_filters
+from services.suggestions import suggestion_index
 
 search_bp = Blueprint('search', __name__)
 
-def get_db_connection():
-    """Get database connection"""
-    os.makedirs('data', exist_ok=True)
-    conn = sqlite3.connect('data/events.db')
-    conn.row_factory = sqlite3.Row
-    return conn
+QUICK_SEARCH_LIMIT = 5
+MAX_QUICK_SEARCH_LIMIT = 20
 
 @search_bp.route('/')
+@conditional(page=True)
 def search_page():
     """Main search page"""
     query = request.args.get('q', '').strip()
@@ -25,44 +25,18 @@ def search_page():
     total_results = 0
     
     if query or status_filter or (date_from and date_to):
-        conn = get_db_connection()
+        conn = get_db()
         
-        # Build SQL query based on criteria
-        sql_parts = []
-        params = []
+        # Build SQL filters based on criteria
+        sql_parts, params = event_filters(status_filter, date_from, date_to)
         
         if query:
-            if search_type == 'title':
-                sql_parts.append("title LIKE ?")
-                params.append(f"%{query}%")
-            elif search_type == 'location':
-                sql_parts.append("location LIKE ?")
-                params.append(f"%{query}%")
-            elif search_type == 'description':
-                sql_parts.append("description LIKE ?")
-                params.append(f"%{query}%")
-            else:  # search all fields
-                sql_parts.append("(title LIKE ? OR description LIKE ? OR location LIKE ?)")
-                params.extend([f"%{query}%", f"%{query}%", f"%{query}%"])
-        
-        if status_filter:
-            sql_parts.append("status = ?")
-            params.append(status_filter)
-        
-        if date_from and date_to:
-            try:
-                start_date = datetime.strptime(date_from, '%Y-%m-%d').isoformat()
-                end_date = datetime.strptime(date_to, '%Y-%m-%d').replace(hour=23, minute=59).isoformat()
-                sql_parts.append("date BETWEEN ? AND ?")
-                params.extend([start_date, end_date])
-            except ValueError:
-                pass  # Invalid date format, ignore filter
-        
-        if sql_parts:
-            sql = f"SELECT * FROM events WHERE {' AND '.join(sql_parts)} ORDER BY date DESC"
+            # Ranked full-text search, filtered by status/date
+            results = fulltext.search_events(conn, query, search_type, sql_parts, params)
+        elif sql_parts:
+            sql = f"SELECT * FROM events e WHERE {' AND '.join(sql_parts)} ORDER BY e.starts_at DESC"
             results = conn.execute(sql, params).fetchall()
         
-        conn.close()
         total_results = len(results)
     
     return render_template('search.html',
@@ -78,7 +52,10 @@ def search_page():
 def quick_search_api():
     """API endpoint for quick search (AJAX)"""
     query = request.args.get('q', '').strip()
-    limit = request.args.get('limit', 5, type=int)
+    limit = request.args.get('limit', QUICK_SEARCH_LIMIT, type=int)
+    # Bounded so a caller can neither ask for every match nor spread the
+    # cache over arbitrarily many keys
+    limit = max(1, min(limit, MAX_QUICK_SEARCH_LIMIT))
     
     if not query:
         return jsonify({
@@ -87,20 +64,15 @@ def quick_search_api():
         })
     
     try:
-        conn = get_db_connection()
-        
-        # Quick search across all fields
-        results = conn.execute('''
-            SELECT * FROM events 
-            WHERE title LIKE ? OR description LIKE ? OR location LIKE ?
-            ORDER BY date DESC
-            LIMIT ?
-        ''', (f"%{query}%", f"%{query}%", f"%{query}%", limit)).fetchall()
-        
-        conn.close()
+        conn = get_db()
         
-        # Convert to dict
-        results_data = [dict(row) for row in results]
+        # Quick search across all fields, best matches first
+        key = ('quick-search', query.casefold(), limit)
+        version = response_cache.version(conn)
+        results_data = response_cache.get(key, version)
+        if results_data is MISSING:
+            results_data = fulltext.search_events(conn, query, limit=limit)
+            response_cache.set(key, version, results_data)
         
         return jsonify({
             'success': True,
@@ -126,35 +98,12 @@ def search_suggestions_api():
         })
     
     try:
-        conn = get_db_connection()
-        
-        # Get events that match the query
-        events = conn.execute('''
-            SELECT title, location FROM events 
-            WHERE title LIKE ? OR location LIKE ?
-            LIMIT 10
-        ''', (f"%{query}%", f"%{query}%")).fetchall()
-        
-        conn.close()
-        
-        # Extract unique suggestions
-        suggestions = set()
-        
-        for event in events:
-            # Add title words that contain the query
-            if event['title']:
-                title_words = event['title'].lower().split()
-                for word in title_words:
-                    if query.lower() in word and len(word) > 2:
-                        suggestions.add(word.title())
-            
-            # Add location if it contains the query
-            if event['location'] and query.lower() in event['location'].lower():
-                suggestions.add(event['location'])
+        # Served from the in-memory prefix index; SQLite is only read to build it
+        suggestions = suggestion_index.suggest(query, get_db)
         
         return jsonify({
             'success': True,
-            'suggestions': list(suggestions)[:8]  # Limit to 8 suggestions
+            'suggestions': suggestions
         })
     
     except Exception as e:
@@ -0,0 +1,104 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_PATH = 'data/ai_cache.db'
+DEFAULT_MAX_ENTRIES = 5000
+
+# One connection per thread and cache file, shared by every AICache instance
+_local = threading.local()
+
+
+def normalize_text(text):
+    """Collapse whitespace so trivially different submissions share a key"""
+    return ' '.join((text or '').split())
+
+
+class AICache:
+    """SQLite-backed cache of model responses shared by every worker
+
+    Lives in its own database file so cache writes never contend with
+    event writes. Least recently used rows are evicted past max_entries.
+    Any SQLite error is treated as a miss - the cache must never break
+    event creation.
+    """
+
+    def __init__(self, path=DEFAULT_PATH, max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+
+    def _connection(self):
+        if getattr(_local, 'pid', None) != os.getpid():
+            _local.pid = os.getpid()
+            _local.connections = {}
+        conn = _local.connections.get(self.path)
+        if conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute('PRAGMA journal_mode = WAL')
+            conn.execute('PRAGMA synchronous = NORMAL')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS ai_cache (
+                    key TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_used REAL NOT NULL
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_ai_cache_last_used ON ai_cache (last_used)')
+            conn.commit()
+            _local.connections[self.path] = conn
+        return conn
+
+    @staticmethod
+    def make_key(kind, *parts):
+        """Stable key for a request kind and its inputs"""
+        raw = '\x1f'.join([kind] + [normalize_text(str(part)) for part in parts])
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """Return the cached value or None"""
+        try:
+            conn = self._connection()
+            row = conn.execute('SELECT value FROM ai_cache WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return None
+            conn.execute('UPDATE ai_cache SET last_used = ? WHERE key = ?', (time.time(), key))
+            conn.commit()
+            return row[0]
+        except sqlite3.Error:
+            self._rollback()
+            return None
+
+    def set(self, key, kind, value):
+        """Store a value and evict the least recently used overflow"""
+        try:
+            conn = self._connection()
+            now = time.time()
+            conn.execute('''
+                INSERT OR REPLACE INTO ai_cache (key, kind, value, created_at, last_used)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (key, kind, value, now, now))
+            excess = conn.execute('SELECT COUNT(*) FROM ai_cache').fetchone()[0] - self.max_entries
+            if excess > 0:
+                conn.execute('''
+                    DELETE FROM ai_cache WHERE key IN (
+                        SELECT key FROM ai_cache ORDER BY last_used LIMIT ?
+                    )
+                ''', (excess,))
+            conn.commit()
+        except sqlite3.Error:
+            self._rollback()
+
+    def _rollback(self):
+        conn = getattr(_local, 'connections', {}).get(self.path)
+        if conn is not None and conn.in_transaction:
+            try:
+                conn.rollback()
+            except sqlite3.Error:
+                pass
@@ -0,0 +1,332 @@
+import logging
+import os
+import threading
+import time
+import uuid
+from datetime import datetime
+
+from flask import current_app
+
+from services import connection
+from services.suggestions import suggestion_index
+from services.validation import validate_event
+from services.writer import get_write_queue
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = max(1, int(os.getenv('AI_JOB_WORKERS', 2)))
+MAX_ATTEMPTS = max(1, int(os.getenv('AI_JOB_MAX_ATTEMPTS', 5)))
+BACKOFF_BASE = 5.0      # seconds before the first retry, doubled after each
+BACKOFF_MAX = 300.0
+# A running job whose worker has not finished it by then is claimed again,
+# which is how jobs interrupted by a restart or crash resume
+LEASE_SECONDS = 120.0
+POLL_INTERVAL = 1.0     # idle workers look for other processes' jobs this often
+# Long-polls hold a request thread, so they are short and only a few may
+# wait at once; the rest get the current state and poll again
+MAX_WAIT = 5.0
+MAX_WAITERS = 2
+
+STATUSES = ('queued', 'running', 'done', 'needs_clarification', 'failed')
+FINISHED = frozenset(('done', 'needs_clarification', 'failed'))
+
+MIGRATION = (
+    '''
+    CREATE TABLE IF NOT EXISTS ai_jobs (
+        id TEXT PRIMARY KEY,
+        input TEXT NOT NULL,
+        status TEXT NOT NULL DEFAULT 'queued',
+        attempts INTEGER NOT NULL DEFAULT 0,
+        run_after REAL NOT NULL,
+        event_id INTEGER,
+        message TEXT,
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+    )
+    ''',
+    'CREATE INDEX IF NOT EXISTS idx_ai_jobs_status_run_after ON ai_jobs (status, run_after)',
+)
+
+# Read-only check run by idle workers before they queue a claim write
+CLAIMABLE_SQL = '''
+    SELECT 1 FROM ai_jobs
+    WHERE status IN ('queued', 'running') AND run_after <= ?
+    LIMIT 1
+'''
+
+CLAIM_SQL = '''
+    UPDATE ai_jobs
+    SET status = 'running', attempts = attempts + 1, run_after = ?, updated_at = CURRENT_TIMESTAMP
+    WHERE id = (
+        SELECT id FROM ai_jobs
+        WHERE status IN ('queued', 'running') AND run_after <= ?
+        ORDER BY run_after
+        LIMIT 1
+    )
+    RETURNING id, input, attempts
+'''
+
+_runners = {}
+_runners_pid = None
+_runners_lock = threading.Lock()
+# Notified whenever a job in this process finishes, to end long-polls early
+_finished = threading.Condition()
+_waiters = threading.BoundedSemaphore(MAX_WAITERS)
+
+
+class JobRetry(Exception):
+    """The job failed in a way worth trying again"""
+
+
+def submit_job(text, database=None):
+    """Queue text for parsing into an event; returns the job id"""
+    database = database or current_app.config['DATABASE']
+    job_id = uuid.uuid4().hex
+    get_write_queue(database).execute(
+        'INSERT INTO ai_jobs (id, input, run_after) VALUES (?, ?, ?)',
+        (job_id, text, time.time())
+    )
+    start_workers(database).wake()
+    return job_id
+
+
+def get_job(conn, job_id):
+    """A job's public state as a dict, or None"""
+    row = conn.execute('''
+        SELECT id, status, attempts, event_id, message, created_at, updated_at
+        FROM ai_jobs WHERE id = ?
+    ''', (job_id,)).fetchone()
+    return dict(row) if row else None
+
+
+def wait_for_job(conn, job_id, timeout):
+    """get_job, waiting up to timeout seconds for the job to finish
+
+    Jobs finished by this process end the wait at once; those run by
+    other processes are seen on the next poll. The wait is capped at
+    MAX_WAIT, and when MAX_WAITERS requests are already waiting the
+    current state is returned straight away.
+    """
+    job = get_job(conn, job_id)
+    # Written so NaN becomes 0 rather than slipping past the comparisons
+    timeout = min(timeout, MAX_WAIT) if timeout > 0 else 0.0
+    if job is None or job['status'] in FINISHED or not timeout:
+        return job
+    if not _waiters.acquire(blocking=False):
+        return job
+    try:
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return job
+            with _finished:
+                _finished.wait(min(remaining, POLL_INTERVAL))
+            job = get_job(conn, job_id)
+            if job is None or job['status'] in FINISHED:
+                return job
+    finally:
+        _waiters.release()
+
+
+def backoff(attempts):
+    """Seconds to wait before attempt number attempts + 1"""
+    return min(BACKOFF_BASE * 2 ** (attempts - 1), BACKOFF_MAX)
+
+
+def _event_values(result):
+    """The parsed event as validated INSERT values, or raise"""
+    if result.get('success'):
+        event_data = result['event_data']
+        if not event_data.get('needs_clarification'):
+            date = event_data.get('date')
+            return validate_event({
+                'title': event_data.get('title'),
+                'description': event_data.get('description'),
+                'date': date.isoformat() if isinstance(date, datetime) else date,
+                'location': event_data.get('location'),
+                'status': event_data.get('status') or 'upcoming'
+            })
+        raise ValueError(event_data.get('clarification_message') or 'Need clarification')
+    if result.get('needs_clarification'):
+        raise ValueError(result.get('clarification_message') or result.get('error'))
+    raise JobRetry(result.get('error', 'Unknown error'))
+
+
+class JobRunner:
+    """Worker threads that parse queued jobs and insert their events
+
+    Jobs are claimed with a single UPDATE ... RETURNING, so several
+    processes can share the table. All writes go through the process's
+    writer queue, and each finishing write only applies if the job is
+    still held by the same attempt.
+    """
+
+    def __init__(self, database, workers=DEFAULT_WORKERS):
+        self.database = database
+        self._stopping = False
+        self._wake = threading.Event()
+        self._threads = [
+            threading.Thread(target=self._run, name=f'ai-job-{n}', daemon=True)
+            for n in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def wake(self):
+        self._wake.set()
+
+    def shutdown(self, timeout=None):
+        """Stop the threads once their current job is done"""
+        self._stopping = True
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def _write(self, write):
+        return get_write_queue(self.database).submit(write)
+
+    def _claim(self):
+        now = time.time()
+
+        def claim(conn):
+            rows = conn.execute(CLAIM_SQL, (now + LEASE_SECONDS, now)).fetchall()
+            return dict(rows[0]) if rows else None
+        return self._write(claim)
+
+    def _claimable(self, reader):
+        return reader.execute(CLAIMABLE_SQL, (time.time(),)).fetchone() is not None
+
+    def _run(self):
+        reader = None
+        while not self._stopping:
+            job = None
+            try:
+                # Idle polls stay read-only; only a claimable job costs a write
+                if reader is None:
+                    reader = connection.connect_readonly(self.database)
+                if self._claimable(reader):
+                    job = self._claim()
+            except Exception:
+                logger.exception("Claiming an AI job failed")
+                if reader is not None:
+                    reader.close()
+                    reader = None
+            if job is None:
+                self._wake.wait(POLL_INTERVAL)
+                self._wake.clear()
+                continue
+            try:
+                self._process(job['id'], job['input'], job['attempts'])
+            except Exception:
+                # The lease runs out and another attempt picks the job up
+                logger.exception("AI job %s failed", job['id'])
+            with _finished:
+                _finished.notify_all()
+        if reader is not None:
+            reader.close()
+
+    def _process(self, job_id, text, attempts):
+        from services.ai_service import get_ai_service
+        try:
+            # Retry the model on errors; only the last attempt falls back
+            # to local parsing
+            result = get_ai_service().parse_natural_language_event(
+                text, fallback=attempts >= MAX_ATTEMPTS
+            )
+            values = _event_values(result)
+        except ValueError as e:
+            # Retrying the same input would get the same answer
+            self._finish(job_id, attempts, 'needs_clarification', message=str(e))
+            return
+        except Exception as e:
+            if attempts >= MAX_ATTEMPTS:
+                self._finish(job_id, attempts, 'failed', message=str(e))
+            else:
+                self._retry(job_id, attempts, str(e))
+            return
+
+        def insert(conn):
+            if not _held(conn, job_id, attempts):
+                return None
+            event_id = conn.execute('''
+                INSERT INTO events (title, description, date, location, status)
+                VALUES (?, ?, ?, ?, ?)
+            ''', values).lastrowid
+            _set_status(conn, job_id, 'done', event_id=event_id)
+            return event_id
+
+        try:
+            if self._write(insert) is not None:
+                suggestion_index.add_event(values[0], values[3])
+        except Exception as e:
+            logger.exception("Inserting the event for AI job %s failed", job_id)
+            self._retry(job_id, attempts, str(e))
+
+    def _finish(self, job_id, attempts, status, message=None):
+        def write(conn):
+            if _held(conn, job_id, attempts):
+                _set_status(conn, job_id, status, message=message)
+        self._write(write)
+
+    def _retry(self, job_id, attempts, message):
+        delay = backoff(attempts)
+        logger.warning("AI job %s attempt %d failed: %s - retrying in %.0fs",
+                       job_id, attempts, message, delay)
+
+        def write(conn):
+            if _held(conn, job_id, attempts):
+                conn.execute('''
+                    UPDATE ai_jobs
+                    SET status = 'queued', run_after = ?, message = ?, updated_at = CURRENT_TIMESTAMP
+                    WHERE id = ?
+                ''', (time.time() + delay, message, job_id))
+        self._write(write)
+
+
+def _held(conn, job_id, attempts):
+    """Whether the job is still running under this attempt (not re-claimed)"""
+    row = conn.execute('SELECT status, attempts FROM ai_jobs WHERE id = ?', (job_id,)).fetchone()
+    return row is not None and row['status'] == 'running' and row['attempts'] == attempts
+
+
+def _set_status(conn, job_id, status, event_id=None, message=None):
+    conn.execute('''
+        UPDATE ai_jobs
+        SET status = ?, event_id = ?, message = ?, updated_at = CURRENT_TIMESTAMP
+        WHERE id = ?
+    ''', (status, event_id, message, job_id))
+
+
+def start_workers(database=None):
+    """The process's job runner for a database, started on first use"""
+    global _runners_pid
+    database = database or current_app.config['DATABASE']
+    with _runners_lock:
+        if _runners_pid != os.getpid():
+            # Worker threads do not survive a fork
+            _runners.clear()
+            _runners_pid = os.getpid()
+        runner = _runners.get(database)
+        if runner is None:
+            runner = _runners[database] = JobRunner(database)
+        return runner
+
+
+def stop_workers():
+    """Stop every job runner this process started"""
+    with _runners_lock:
+        runners = list(_runners.values()) if _runners_pid == os.getpid() else []
+        _runners.clear()
+    for runner in runners:
+        runner.shutdown()
+
+
+def _ensure_workers():
+    start_workers()
+
+
+def init_app(app):
+    """Start each process's job workers with its first request, so jobs
+    left queued by a previous run are picked up after a restart"""
+    app.before_request(_ensure_workers)
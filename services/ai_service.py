@@ -1,40 +1,150 @@
 import os
 import json
-from datetime import datetime, timedelta
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from datetime import datetime
 from dotenv import load_dotenv
+from services import metrics
+from services.ai_cache import AICache, DEFAULT_MAX_ENTRIES, DEFAULT_PATH
+from services.nl_parser import parse_event_text
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONNECT_TIMEOUT = 3.0
+DEFAULT_READ_TIMEOUT = 20.0
+DEFAULT_MAX_RETRIES = 2
+# Request handlers wait at most this long for the model, then fall back
+DEFAULT_REQUEST_BUDGET = 8.0
+# AI calls in flight per process; past this, requests fall back at once
+DEFAULT_MAX_CONCURRENCY = 2
+
+_service = None
+_service_pid = None
+_service_lock = threading.Lock()
+
+
+def get_ai_service():
+    """Return the process-wide AIService, creating it on first use
+
+    One instance means one OpenAI client and one keep-alive connection pool
+    per worker, so only the first AI call pays for the TLS handshake.
+    """
+    global _service, _service_pid
+    pid = os.getpid()
+    if _service is None or _service_pid != pid:
+        with _service_lock:
+            # A client inherited from a pre-fork parent must not be reused
+            if _service is None or _service_pid != pid:
+                _service = AIService()
+                _service_pid = pid
+    return _service
+
+
+class AIBudgetExceeded(Exception):
+    """No free AI slot, or no response within the caller's budget"""
+
+
 class AIService:
     """AI Service for smart event creation using OpenAI GPT-4"""
     
     def __init__(self):
         self.api_key = os.getenv('OPENAI_API_KEY')
         self.model = "gpt-4o-mini"  # Use more affordable model
+        self.cache = AICache(
+            os.getenv('AI_CACHE_PATH', DEFAULT_PATH),
+            int(os.getenv('AI_CACHE_MAX_ENTRIES', DEFAULT_MAX_ENTRIES))
+        )
+        
+        self.connect_timeout = float(os.getenv('OPENAI_CONNECT_TIMEOUT', DEFAULT_CONNECT_TIMEOUT))
+        self.read_timeout = float(os.getenv('OPENAI_READ_TIMEOUT', DEFAULT_READ_TIMEOUT))
+        self.max_retries = int(os.getenv('OPENAI_MAX_RETRIES', DEFAULT_MAX_RETRIES))
+        self.request_budget = float(os.getenv('AI_REQUEST_BUDGET', DEFAULT_REQUEST_BUDGET))
+        self.max_concurrency = max(1, int(os.getenv('AI_MAX_CONCURRENCY', DEFAULT_MAX_CONCURRENCY)))
+        self._slots = threading.BoundedSemaphore(self.max_concurrency)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix='ai-call')
         
         # Try to import openai, but don't fail if not available
         try:
             import openai
             if self.api_key and self.api_key.startswith('sk-'):
-                self.client = openai.OpenAI(api_key=self.api_key)
+                self.client = self._build_client(openai)
                 self.available = True
-                print("✅ OpenAI client initialized successfully")
+                logger.info("OpenAI client initialized (model=%s)", self.model)
             else:
                 self.client = None
                 self.available = False
-                print("⚠️  No valid OpenAI API key found - using simple parsing")
+                logger.warning("No valid OpenAI API key found - using simple parsing")
         except ImportError:
             self.client = None
             self.available = False
-            print("⚠️  OpenAI not available - install with: pip install openai")
+            logger.warning("OpenAI not available - install with: pip install openai")
         except Exception as e:
             self.client = None
             self.available = False
-            print(f"⚠️  OpenAI initialization failed: {str(e)} - using simple parsing")
+            logger.warning("OpenAI initialization failed: %s - using simple parsing", e)
+    
+    def _build_client(self, openai):
+        """OpenAI client over a keep-alive httpx pool with explicit timeouts"""
+        import httpx
+        timeout = httpx.Timeout(self.read_timeout, connect=self.connect_timeout)
+        http_client = httpx.Client(
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=60.0)
+        )
+        return openai.OpenAI(
+            api_key=self.api_key,
+            timeout=timeout,
+            max_retries=self.max_retries,
+            http_client=http_client
+        )
+    
+    def _complete(self, operation, budget=None, **kwargs):
+        """Chat completion call, timed into the AI metrics
+        
+        With a budget the call runs on the AI executor and the caller waits
+        at most budget seconds; AIBudgetExceeded is raised when all slots
+        are busy or time runs out. Abandoned calls finish in the background
+        and keep their slot until they do, so the cap holds.
+        """
+        if budget is None:
+            return self._call(operation, **kwargs)
+        
+        if not self._slots.acquire(blocking=False):
+            metrics.record_ai_call(operation, 0.0, 'saturated')
+            raise AIBudgetExceeded(f'all {self.max_concurrency} AI slots are busy')
+        try:
+            future = self._executor.submit(self._call, operation, **kwargs)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=budget)
+        except FutureTimeoutError:
+            metrics.record_ai_call(operation, budget, 'timeout')
+            raise AIBudgetExceeded(f'no response within {budget:g}s')
+    
+    def _call(self, operation, **kwargs):
+        started = time.perf_counter()
+        outcome = 'error'
+        try:
+            response = self.client.chat.completions.create(model=self.model, **kwargs)
+            outcome = 'ok'
+            return response
+        finally:
+            metrics.record_ai_call(operation, time.perf_counter() - started, outcome)
     
-    def parse_natural_language_event(self, user_input):
+    def parse_natural_language_event(self, user_input, budget=None, fallback=True):
         """
         Parse natural language input and extract event information
+        
+        Request handlers pass a budget (seconds); past it, or when every AI
+        slot is busy, the input is parsed locally instead. With
+        fallback=False API errors are raised, for callers that retry.
         """
         
         if not user_input or not user_input.strip():
@@ -83,22 +193,32 @@ class AIService:
         If you cannot determine a date, set needs_clarification to true and provide a helpful message.
         """
         
+        # Relative dates ("tomorrow") depend on the day, so it is part of the key
+        cache_key = self.cache.make_key('parse', self.model, current_date[:10], user_input)
+        
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_input}
-                ],
-                temperature=0.1,
-                max_tokens=300
-            )
+            result_text = self.cache.get(cache_key)
+            from_cache = result_text is not None
             
-            result_text = response.choices[0].message.content.strip()
+            if not from_cache:
+                response = self._complete(
+                    'parse',
+                    budget=budget,
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": user_input}
+                    ],
+                    temperature=0.1,
+                    max_tokens=300
+                )
+                
+                result_text = response.choices[0].message.content.strip()
             
             # Parse JSON response
             try:
                 event_data = json.loads(result_text)
+                if not from_cache:
+                    self.cache.set(cache_key, 'parse', result_text)
                 
                 # Validate required fields
                 if not event_data.get('title'):
@@ -136,7 +256,9 @@ class AIService:
                 }
                 
         except Exception as e:
-            print(f"OpenAI API error: {str(e)}")
+            if not fallback:
+                raise
+            logger.warning("OpenAI API error: %s - falling back to simple parsing", e)
             # Fall back to simple parsing
             return self._simple_parse(user_input)
     
@@ -144,209 +266,13 @@ class AIService:
         """
         Simple parsing fallback when OpenAI is not available
         """
-        if not user_input or not user_input.strip():
-            return {
-                "success": False,
-                "error": "Please provide event details",
-                "needs_clarification": True,
-                "clarification_message": "Please describe your event"
-            }
-        
-        # Basic keyword-based parsing
-        input_lower = user_input.lower().strip()
-        
-        # Extract title (first part before time/date keywords)
-        time_keywords = ['tomorrow', 'today', 'next', 'at', 'on', 'monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
-        
-        title = user_input.strip()
-        date_mentioned = False
-        
-        # Check if any date keyword is mentioned
-        for keyword in time_keywords:
-            if keyword in input_lower:
-                date_mentioned = True
-                # Split at the keyword to get title
-                parts = user_input.split(keyword, 1)
-                if parts[0].strip():
-                    title = parts[0].strip()
-                break
-        
-        # Clean up title
-        title = title.replace('  ', ' ').strip()
-        if not title:
-            title = user_input.strip()
-        
-        # Simple date parsing
-        now = datetime.now()
-        event_date = None
-        
-        # Check for specific date keywords
-        if 'tomorrow' in input_lower:
-            event_date = now + timedelta(days=1)
-            event_date = event_date.replace(hour=9, minute=0, second=0, microsecond=0)
-            print(f"Parsed 'tomorrow': {event_date}")
-            
-        elif 'today' in input_lower:
-            event_date = now.replace(hour=9, minute=0, second=0, microsecond=0)
-            if event_date < now:  # If 9am has passed, set to current time + 1 hour
-                event_date = now + timedelta(hours=1)
-                event_date = event_date.replace(minute=0, second=0, microsecond=0)
-            print(f"Parsed 'today': {event_date}")
-            
-        elif 'next week' in input_lower:
-            event_date = now + timedelta(days=7)
-            event_date = event_date.replace(hour=9, minute=0, second=0, microsecond=0)
-            print(f"Parsed 'next week': {event_date}")
-            
-        elif 'monday' in input_lower:
-            days_ahead = 0 - now.weekday()  # Monday is 0
-            if days_ahead <= 0:  # Target day already happened this week
-                days_ahead += 7
-            event_date = now + timedelta(days=days_ahead)
-            event_date = event_date.replace(hour=9, minute=0, second=0, microsecond=0)
-            print(f"Parsed 'monday': {event_date}")
-            
-        elif 'tuesday' in input_lower:
-            days_ahead = 1 - now.weekday()  # Tuesday is 1
-            if days_ahead <= 0:
-                days_ahead += 7
-            event_date = now + timedelta(days=days_ahead)
-            event_date = event_date.replace(hour=9, minute=0, second=0, microsecond=0)
-            
-        elif 'wednesday' in input_lower:
-            days_ahead = 2 - now.weekday()  # Wednesday is 2
-            if days_ahead <= 0:
-                days_ahead += 7
-            event_date = now + timedelta(days=days_ahead)
-            event_date = event_date.replace(hour=9, minute=0, second=0, microsecond=0)
-            
-        elif 'thursday' in input_lower:
-            days_ahead = 3 - now.weekday()  # Thursday is 3
-            if days_ahead <= 0:
-                days_ahead += 7
-            event_date = now + timedelta(days=days_ahead)
-            event_date = event_date.replace(hour=9, minute=0, second=0, microsecond=0)
-            
-        elif 'friday' in input_lower:
-            days_ahead = 4 - now.weekday()  # Friday is 4
-            if days_ahead <= 0:
-                days_ahead += 7
-            event_date = now + timedelta(days=days_ahead)
-            event_date = event_date.replace(hour=9, minute=0, second=0, microsecond=0)
-            
-        elif 'saturday' in input_lower:
-            days_ahead = 5 - now.weekday()  # Saturday is 5
-            if days_ahead <= 0:
-                days_ahead += 7
-            event_date = now + timedelta(days=days_ahead)
-            event_date = event_date.replace(hour=9, minute=0, second=0, microsecond=0)
-            
-        elif 'sunday' in input_lower:
-            days_ahead = 6 - now.weekday()  # Sunday is 6
-            if days_ahead <= 0:
-                days_ahead += 7
-            event_date = now + timedelta(days=days_ahead)
-            event_date = event_date.replace(hour=9, minute=0, second=0, microsecond=0)
-            
-        elif 'next' in input_lower:
-            # Default "next" to next week if no specific day mentioned
-            event_date = now + timedelta(days=7)
-            event_date = event_date.replace(hour=9, minute=0, second=0, microsecond=0)
-            print(f"Parsed 'next': {event_date}")
-        
-        # If no date keywords found, set default to tomorrow
-        if not event_date and not date_mentioned:
-            event_date = now + timedelta(days=1)
-            event_date = event_date.replace(hour=9, minute=0, second=0, microsecond=0)
-            print(f"No date mentioned, defaulting to tomorrow: {event_date}")
-        
-        # Extract time if mentioned
-        if event_date and 'at' in input_lower:
-            try:
-                # Find the part after "at"
-                at_parts = user_input.lower().split('at')
-                if len(at_parts) > 1:
-                    time_part = at_parts[1].strip().split()[0]
-                    print(f"Trying to parse time: '{time_part}'")
-                    
-                    # Handle different time formats
-                    if 'pm' in time_part:
-                        hour_str = time_part.replace('pm', '').strip()
-                        hour = int(hour_str)
-                        if hour != 12:
-                            hour += 12
-                        event_date = event_date.replace(hour=hour, minute=0)
-                        print(f"Parsed PM time: {hour}:00")
-                        
-                    elif 'am' in time_part:
-                        hour_str = time_part.replace('am', '').strip()
-                        hour = int(hour_str)
-                        if hour == 12:
-                            hour = 0
-                        event_date = event_date.replace(hour=hour, minute=0)
-                        print(f"Parsed AM time: {hour}:00")
-                        
-                    elif ':' in time_part:
-                        time_obj = datetime.strptime(time_part, '%H:%M')
-                        event_date = event_date.replace(hour=time_obj.hour, minute=time_obj.minute)
-                        print(f"Parsed HH:MM time: {time_obj.hour}:{time_obj.minute}")
-                        
-                    elif time_part.isdigit():
-                        hour = int(time_part)
-                        # Assume afternoon if hour is reasonable
-                        if 1 <= hour <= 11:
-                            hour += 12  # Make it PM
-                        event_date = event_date.replace(hour=hour, minute=0)
-                        print(f"Parsed numeric time as PM: {hour}:00")
-                        
-            except Exception as e:
-                print(f"Time parsing failed: {e}")
-                # Keep default time if parsing fails
-        
-        # Extract location (look for prepositions)
-        location = None
-        location_preps = [' in ', ' at ']
-        for prep in location_preps:
-            if prep in input_lower:
-                parts = user_input.lower().split(prep)
-                if len(parts) > 1:
-                    location_part = parts[-1].strip()
-                    # Remove time references from location
-                    location_words = []
-                    for word in location_part.split():
-                        if not any(time_word in word.lower() for time_word in ['am', 'pm', ':', 'tomorrow', 'today', 'monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']):
-                            location_words.append(word)
-                    if location_words:
-                        location = ' '.join(location_words)
-                        print(f"Extracted location: '{location}'")
-                break
-        
-        if not event_date:
-            return {
-                "success": False,
-                "error": "Could not determine date",
-                "needs_clarification": True,
-                "clarification_message": "Please specify when this event should happen (e.g., 'tomorrow', 'today at 3pm', 'next Monday')"
-            }
-        
-        print(f"Final parsed data - Title: '{title}', Date: {event_date}, Location: '{location}'")
-        
-        return {
-            "success": True,
-            "event_data": {
-                "title": title,
-                "description": f"Event: {title}",
-                "date": event_date,
-                "location": location,
-                "status": "upcoming",
-                "needs_clarification": False,
-                "clarification_message": None
-            }
-        }
+        return parse_event_text(user_input)
     
-    def enhance_event_description(self, title, location=None):
+    def enhance_event_description(self, title, location=None, budget=None):
         """
         Generate or enhance event description
+        
+        budget bounds the wait as in parse_natural_language_event.
         """
         if not self.available or not self.client:
             # Simple fallback
@@ -355,14 +281,20 @@ class AIService:
                 description += f" at {location}"
             return description
         
+        cache_key = self.cache.make_key('describe', self.model, title, location or '')
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
         prompt = f"Create a brief, professional event description for: '{title}'"
         if location:
             prompt += f" at {location}"
         prompt += ". Keep it under 100 words and make it helpful."
         
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
+            response = self._complete(
+                'describe',
+                budget=budget,
                 messages=[
                     {"role": "system", "content": "You are a helpful assistant that creates brief, professional event descriptions."},
                     {"role": "user", "content": prompt}
@@ -371,8 +303,10 @@ class AIService:
                 max_tokens=150
             )
             
-            return response.choices[0].message.content.strip()
+            description = response.choices[0].message.content.strip()
+            self.cache.set(cache_key, 'describe', description)
+            return description
             
         except Exception as e:
-            print(f"Description enhancement error: {str(e)}")
+            logger.warning("Description enhancement error: %s", e)
             return f"Event: {title}" + (f" at {location}" if location else "")
\ No newline at end of file
@@ -0,0 +1,139 @@
+import sqlite3
+
+from services.stats import VALID_STATUSES
+from services.suggestions import suggestion_index
+from services.validation import validate_event
+
+MAX_OPERATIONS = 1000
+OPERATIONS = ('create', 'update', 'status', 'delete')
+
+
+def _event_ids(operation):
+    """The `id` or `ids` of an operation as a list of ints"""
+    ids = operation['ids'] if 'ids' in operation else [operation.get('id')]
+    if (not isinstance(ids, list) or not ids or len(ids) > MAX_OPERATIONS
+            or not all(isinstance(i, int) and not isinstance(i, bool) for i in ids)):
+        raise ValueError(f'id must be an integer, ids a list of 1-{MAX_OPERATIONS} integers')
+    return ids
+
+
+def _event_fields(operation):
+    """The operation's `event` object, which must be a dict if present"""
+    event = operation.get('event')
+    if event is None:
+        return {}
+    if not isinstance(event, dict):
+        raise ValueError('event must be an object')
+    return event
+
+
+def _check_found(ids, found):
+    missing = [i for i in ids if i not in found]
+    if missing:
+        raise ValueError(f"Event not found: {', '.join(map(str, missing))}")
+
+
+def _create(conn, operation, index_changes):
+    values = validate_event(_event_fields(operation))
+    event_id = conn.execute('''
+        INSERT INTO events (title, description, date, location, status)
+        VALUES (?, ?, ?, ?, ?)
+    ''', values).lastrowid
+    index_changes.append(('add_event', (values[0], values[3])))
+    return {'id': event_id}
+
+
+def _update(conn, operation, index_changes):
+    event_id = _event_ids({'id': operation.get('id')})[0]
+    event = conn.execute('SELECT * FROM events WHERE id = ?', (event_id,)).fetchone()
+    _check_found([event_id], set() if event is None else {event_id})
+    # Fields left out keep their current value
+    fields = dict(event)
+    fields.update(_event_fields(operation))
+    values = validate_event(fields)
+    conn.execute('''
+        UPDATE events
+        SET title = ?, description = ?, date = ?, location = ?, status = ?, updated_at = CURRENT_TIMESTAMP
+        WHERE id = ?
+    ''', values + (event_id,))
+    index_changes.append(('update_event', (event['title'], event['location'], values[0], values[3])))
+    return {'id': event_id}
+
+
+def _status(conn, operation, index_changes):
+    ids = _event_ids(operation)
+    status = operation.get('status')
+    if status not in VALID_STATUSES:
+        raise ValueError(f'Invalid status: {status}')
+    placeholders = ','.join('?' * len(ids))
+    found = {row[0] for row in conn.execute(f'''
+        UPDATE events SET status = ?, updated_at = CURRENT_TIMESTAMP
+        WHERE id IN ({placeholders})
+        RETURNING id
+    ''', [status] + ids)}
+    _check_found(ids, found)
+    return {'ids': ids}
+
+
+def _delete(conn, operation, index_changes):
+    ids = _event_ids(operation)
+    placeholders = ','.join('?' * len(ids))
+    deleted = conn.execute(f'''
+        DELETE FROM events WHERE id IN ({placeholders})
+        RETURNING id, title, location
+    ''', ids).fetchall()
+    _check_found(ids, {row['id'] for row in deleted})
+    index_changes.extend(('remove_event', (row['title'], row['location'])) for row in deleted)
+    return {'ids': ids}
+
+
+HANDLERS = {'create': _create, 'update': _update, 'status': _status, 'delete': _delete}
+
+
+class BatchRejected(Exception):
+    """An atomic batch had failing items; nothing was applied"""
+
+    def __init__(self, results):
+        failed = sum(1 for result in results if not result['success'])
+        super().__init__(f'{failed} of {len(results)} operations failed; nothing was applied')
+        self.results = results
+
+
+def apply_operations(conn, operations, atomic=True):
+    """Apply create/update/status/delete operations in the open transaction
+
+    Each operation runs under its own savepoint, so a failed item leaves
+    no partial writes. With atomic=True any failure raises BatchRejected,
+    for the caller to roll back; otherwise the successful items stand.
+    Returns (per-item results, suggestion index changes to apply once
+    the transaction commits).
+    """
+    results = []
+    index_changes = []
+    for position, operation in enumerate(operations):
+        op = operation.get('op') if isinstance(operation, dict) else None
+        result = {'index': position, 'op': op}
+        item_changes = []
+        conn.execute('SAVEPOINT batch_item')
+        try:
+            if op not in HANDLERS:
+                raise ValueError(f"op must be one of: {', '.join(OPERATIONS)}")
+            result.update(HANDLERS[op](conn, operation, item_changes))
+            conn.execute('RELEASE batch_item')
+            result['success'] = True
+            index_changes.extend(item_changes)
+        except (ValueError, sqlite3.IntegrityError) as e:
+            conn.execute('ROLLBACK TO batch_item')
+            conn.execute('RELEASE batch_item')
+            result.update(success=False, error=str(e))
+        results.append(result)
+
+    if atomic and not all(result['success'] for result in results):
+        raise BatchRejected(results)
+    return results, index_changes
+
+
+def apply_index_changes(index_changes):
+    """Replay committed changes into the suggestion index"""
+    for method, args in index_changes:
+        getattr(suggestion_index, method)(*args)
@@ -0,0 +1,260 @@
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from services import connection
+from services.cache import response_cache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = int(os.getenv('BULK_ENHANCE_WORKERS', 4))
+DEFAULT_RATE = float(os.getenv('BULK_ENHANCE_RATE', 3.0))  # AI calls per second
+DEFAULT_BATCH_SIZE = 50
+MAX_WORKERS = 16
+MAX_EVENT_IDS = 999             # one bound parameter each; SQLite's lowest default cap
+MAX_ERRORS_KEPT = 20
+PROGRESS_INTERVAL = 1.0         # seconds between progress writes
+JOB_RETENTION = 24 * 60 * 60    # seconds a job's progress is kept
+
+# Progress lives in the database so any gunicorn worker can report it
+MIGRATION = (
+    '''
+    CREATE TABLE IF NOT EXISTS bulk_enhance_jobs (
+        id TEXT PRIMARY KEY,
+        status TEXT NOT NULL,
+        total INTEGER NOT NULL DEFAULT 0,
+        completed INTEGER NOT NULL DEFAULT 0,
+        updated INTEGER NOT NULL DEFAULT 0,
+        failed INTEGER NOT NULL DEFAULT 0,
+        workers INTEGER NOT NULL,
+        rate REAL NOT NULL,
+        errors TEXT NOT NULL DEFAULT '[]',
+        started_at REAL NOT NULL,
+        finished_at REAL
+    )
+    ''',
+)
+
+# Descriptions the fallback path writes: "Event: <title>" or "... at <location>"
+PLACEHOLDER_SQL = '''
+    description IS NULL OR description = ''
+    OR description = 'Event: ' || title
+    OR description = 'Event: ' || title || ' at ' || location
+'''
+
+
+class RateLimiter:
+    """Token bucket shared by the worker threads"""
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.capacity = max(burst, 1)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a call is allowed"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class BulkEnhanceJob:
+    """Progress of one bulk description run"""
+
+    def __init__(self, workers, rate):
+        self.id = uuid.uuid4().hex
+        self.workers = workers
+        self.rate = rate
+        self.status = 'pending'
+        self.total = 0
+        self.completed = 0
+        self.updated = 0
+        self.failed = 0
+        self.errors = []
+        self.started_at = time.time()
+        self.finished_at = None
+        self._lock = threading.Lock()
+        self._saved_at = 0.0
+
+    def record(self, ok, error=None):
+        with self._lock:
+            self.completed += 1
+            if not ok:
+                self.failed += 1
+                if error and len(self.errors) < MAX_ERRORS_KEPT:
+                    self.errors.append(error)
+
+    def mark_updated(self, count):
+        with self._lock:
+            self.updated += count
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                'id': self.id,
+                'status': self.status,
+                'total': self.total,
+                'completed': self.completed,
+                'updated': self.updated,
+                'failed': self.failed,
+                'progress': round(self.completed / self.total, 4) if self.total else 1.0,
+                'workers': self.workers,
+                'rate': self.rate,
+                'errors': list(self.errors),
+                'started_at': self.started_at,
+                'finished_at': self.finished_at
+            }
+
+    def save(self, conn, force=False):
+        """Write progress to the database, at most every PROGRESS_INTERVAL"""
+        now = time.monotonic()
+        if not force and now - self._saved_at < PROGRESS_INTERVAL:
+            return
+        self._saved_at = now
+        job = self.to_dict()
+        with conn:
+            conn.execute('''
+                INSERT INTO bulk_enhance_jobs (id, status, total, completed, updated, failed,
+                                               workers, rate, errors, started_at, finished_at)
+                VALUES (:id, :status, :total, :completed, :updated, :failed,
+                        :workers, :rate, :errors, :started_at, :finished_at)
+                ON CONFLICT (id) DO UPDATE SET
+                    status = excluded.status, total = excluded.total,
+                    completed = excluded.completed, updated = excluded.updated,
+                    failed = excluded.failed, errors = excluded.errors,
+                    finished_at = excluded.finished_at
+            ''', dict(job, errors=json.dumps(job['errors'])))
+
+
+def get_job(conn, job_id):
+    """A job's progress as a dict, or None; works from any process"""
+    row = conn.execute('SELECT * FROM bulk_enhance_jobs WHERE id = ?', (job_id,)).fetchone()
+    if row is None:
+        return None
+    job = dict(row)
+    job['errors'] = json.loads(job['errors'])
+    job['progress'] = round(job['completed'] / job['total'], 4) if job['total'] else 1.0
+    return job
+
+
+def prune_jobs(conn, now=None):
+    """Forget jobs that finished, or started, more than JOB_RETENTION ago"""
+    cutoff = (now or time.time()) - JOB_RETENTION
+    with conn:
+        conn.execute(
+            'DELETE FROM bulk_enhance_jobs WHERE COALESCE(finished_at, started_at) < ?',
+            (cutoff,)
+        )
+
+
+def start_bulk_enhance(database, ai_service, event_ids=None, workers=DEFAULT_WORKERS,
+                       rate=DEFAULT_RATE, batch_size=DEFAULT_BATCH_SIZE):
+    """Start enhancing descriptions in the background and return the job
+
+    Without event_ids every event whose description is missing or still
+    the "Event: <title>" placeholder is enhanced.
+    """
+    workers = max(1, min(workers, MAX_WORKERS))
+    job = BulkEnhanceJob(workers, rate)
+    conn = connection.connect(database)
+    try:
+        prune_jobs(conn)
+        # Saved before returning so the first status poll finds it
+        job.save(conn, force=True)
+    finally:
+        conn.close()
+    thread = threading.Thread(
+        target=_run_job,
+        args=(job, database, ai_service, event_ids, batch_size),
+        name=f'bulk-enhance-{job.id[:8]}',
+        daemon=True
+    )
+    thread.start()
+    return job
+
+
+def _select_targets(conn, event_ids):
+    if event_ids:
+        placeholders = ','.join('?' * len(event_ids))
+        return conn.execute(
+            f'SELECT id, title, location FROM events WHERE id IN ({placeholders})',
+            list(event_ids)
+        ).fetchall()
+    return conn.execute(f'SELECT id, title, location FROM events WHERE {PLACEHOLDER_SQL}').fetchall()
+
+
+def _write_batch(conn, batch):
+    """Write one batch of (description, id) pairs in a single transaction"""
+    with conn:
+        conn.executemany('''
+            UPDATE events SET description = ?, updated_at = CURRENT_TIMESTAMP
+            WHERE id = ?
+        ''', batch)
+    response_cache.invalidate()
+
+
+def _run_job(job, database, ai_service, event_ids, batch_size):
+    conn = connection.connect(database)
+    try:
+        targets = _select_targets(conn, event_ids)
+        job.total = len(targets)
+        job.status = 'running'
+        job.save(conn, force=True)
+        limiter = RateLimiter(job.rate, burst=job.workers)
+
+        def enhance(row):
+            limiter.acquire()
+            return ai_service.enhance_event_description(row['title'], row['location'])
+
+        batch = []
+        with ThreadPoolExecutor(max_workers=job.workers, thread_name_prefix='enhance') as pool:
+            futures = {pool.submit(enhance, row): row for row in targets}
+            for future in as_completed(futures):
+                row = futures[future]
+                try:
+                    description = future.result()
+                except Exception as e:
+                    job.record(False, f"event {row['id']}: {e}")
+                    job.save(conn)
+                    continue
+                placeholder = f"Event: {row['title']}" + (f" at {row['location']}" if row['location'] else "")
+                if not description or description == placeholder:
+                    # The service fell back; keep the row for a later run
+                    job.record(False, f"event {row['id']}: AI returned no description")
+                    job.save(conn)
+                    continue
+                batch.append((description, row['id']))
+                job.record(True)
+                job.save(conn)
+                if len(batch) >= batch_size:
+                    _write_batch(conn, batch)
+                    job.mark_updated(len(batch))
+                    batch = []
+        if batch:
+            _write_batch(conn, batch)
+            job.mark_updated(len(batch))
+        job.status = 'finished'
+    except Exception as e:
+        logger.exception("Bulk enhance job %s failed", job.id)
+        job.status = 'failed'
+        job.errors.append(str(e))
+    finally:
+        job.finished_at = time.time()
+        try:
+            job.save(conn, force=True)
+        except Exception:
+            logger.exception("Saving bulk enhance job %s failed", job.id)
+        conn.close()
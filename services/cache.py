@@ -0,0 +1,84 @@
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_MAX_ENTRIES = 2048
+DEFAULT_TTL = 60  # seconds
+
+MISSING = object()
+
+
+class ResponseCache:
+    """Bounded LRU cache with TTL for read-only API payloads
+
+    Entries are stamped with a data version. A local generation counter
+    catches writes made by this process, and the trigger-maintained
+    data_revision row catches commits from any other connection, including
+    other gunicorn workers. A stamp that no longer matches counts as a miss.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, ttl=DEFAULT_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def version(self, conn):
+        """Current data version as seen through conn
+
+        Not PRAGMA data_version: its value is only comparable within one
+        connection, and entries are shared by every thread's connection.
+        """
+        revision = conn.execute('SELECT revision FROM data_revision WHERE id = 1').fetchone()[0]
+        return (self.generation, revision)
+
+    def get(self, key, version):
+        """Return the cached value for key, or MISSING"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, entry_version, value = entry
+                if entry_version == version and expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return MISSING
+
+    def set(self, key, version, value):
+        """Store value under key, evicting the least recently used entries"""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, version, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self):
+        """Called after every write so no stale payload is served"""
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+
+    def stats(self):
+        """Hit/miss counters for sizing the cache"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+                'generation': self.generation
+            }
+
+
+response_cache = ResponseCache()
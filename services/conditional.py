@@ -0,0 +1,100 @@
+import os
+from datetime import datetime, timezone
+from functools import wraps
+
+from flask import current_app, make_response, request, session
+
+from services.connection import get_db
+
+# One row bumped by every write to events. PRAGMA data_version only means
+# something to the connection that read it, so it cannot back an ETag that
+# several workers hand out; this counter is the same in every process.
+MIGRATION = (
+    '''
+    CREATE TABLE IF NOT EXISTS data_revision (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        revision INTEGER NOT NULL,
+        changed_at TEXT NOT NULL
+    )
+    ''',
+    "INSERT OR IGNORE INTO data_revision (id, revision, changed_at) VALUES (1, 1, CURRENT_TIMESTAMP)",
+    '''
+    CREATE TRIGGER IF NOT EXISTS data_revision_insert AFTER INSERT ON events BEGIN
+        UPDATE data_revision SET revision = revision + 1, changed_at = CURRENT_TIMESTAMP;
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS data_revision_update AFTER UPDATE ON events BEGIN
+        UPDATE data_revision SET revision = revision + 1, changed_at = CURRENT_TIMESTAMP;
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS data_revision_delete AFTER DELETE ON events BEGIN
+        UPDATE data_revision SET revision = revision + 1, changed_at = CURRENT_TIMESTAMP;
+    END
+    ''',
+)
+
+_template_stamp = None
+
+
+def data_revision(conn):
+    """(revision, changed_at) of the events table; changed_at is UTC"""
+    row = conn.execute('SELECT revision, changed_at FROM data_revision WHERE id = 1').fetchone()
+    changed_at = datetime.strptime(row['changed_at'], '%Y-%m-%d %H:%M:%S').replace(tzinfo=timezone.utc)
+    return row['revision'], changed_at
+
+
+def template_stamp():
+    """Newest template mtime, so a deploy with new markup changes page ETags"""
+    global _template_stamp
+    if _template_stamp is None:
+        folder = os.path.join(current_app.root_path, current_app.template_folder)
+        _template_stamp = int(max(
+            (os.path.getmtime(os.path.join(root, name))
+             for root, _, names in os.walk(folder) for name in names),
+            default=0
+        ))
+    return _template_stamp
+
+
+def conditional(page=False):
+    """Serve 304 Not Modified when the client's copy is still current
+
+    The ETag is the data revision, checked before the view runs, so a
+    matching request skips both the query and the render. HTML pages
+    (page=True) also depend on templates and on the clock (past/upcoming
+    badges, counts), so their ETag adds the template stamp and the current
+    minute and carries no Last-Modified.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method != 'GET' or session.get('_flashes'):
+                # A pending flash message must be rendered
+                return view(*args, **kwargs)
+
+            revision, changed_at = data_revision(get_db())
+            etag = f'r{revision}'
+            if page:
+                etag += f"-t{template_stamp()}-{datetime.now().strftime('%Y%m%d%H%M')}"
+
+            if request.if_none_match:
+                fresh = request.if_none_match.contains_weak(etag)
+            else:
+                fresh = not page and request.if_modified_since is not None \
+                    and changed_at <= request.if_modified_since
+            if fresh:
+                response = current_app.response_class(status=304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag, weak=True)
+            if not page:
+                response.last_modified = changed_at
+            response.cache_control.no_cache = True
+            return response
+        return wrapper
+    return decorator
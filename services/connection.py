@@ -0,0 +1,238 @@
+import os
+import sqlite3
+import threading
+import time
+from urllib.request import pathname2url
+from flask import g, current_app, has_request_context, request
+
+from services import metrics, slowlog
+
+DEFAULT_DATABASE = 'data/events.db'
+
+# Applied once when a connection is opened, never per request
+PRAGMAS = (
+    ('journal_mode', 'WAL'),
+    ('synchronous', 'NORMAL'),
+    ('mmap_size', 268435456),   # 256 MB
+    ('cache_size', -20000),     # ~20 MB of page cache
+    ('busy_timeout', 5000),     # milliseconds
+    ('temp_store', 'MEMORY'),
+)
+
+# Read-only connections skip journal_mode (a property of the file, set by
+# writers) and refuse every write, even one issued by a trigger
+READONLY_PRAGMAS = (
+    ('query_only', 1),
+    ('mmap_size', 268435456),
+    ('cache_size', -20000),
+    ('busy_timeout', 5000),
+    ('temp_store', 'MEMORY'),
+)
+
+# Requests with these methods only ever get the read-only connection
+READ_METHODS = frozenset(('GET', 'HEAD'))
+
+_local = threading.local()
+_created_dirs = set()
+
+
+class TracedCursor(sqlite3.Cursor):
+    """Cursor that times a statement from execute through its last fetch
+
+    SQLite computes rows as they are fetched, so execute alone only covers
+    the first step. The statement is recorded once its rows run out or the
+    cursor is closed, reused or dropped.
+    """
+
+    _sql = None
+
+    def execute(self, sql, parameters=()):
+        self._finish()
+        started = time.perf_counter()
+        try:
+            super().execute(sql, parameters)
+        finally:
+            self._start(sql, parameters, False, started)
+        return self
+
+    def executemany(self, sql, seq_of_parameters):
+        self._finish()
+        started = time.perf_counter()
+        try:
+            super().executemany(sql, seq_of_parameters)
+        finally:
+            self._start(sql, seq_of_parameters, True, started)
+        return self
+
+    def fetchone(self):
+        started = time.perf_counter()
+        row = super().fetchone()
+        self._fetched(started, row is None)
+        return row
+
+    def fetchmany(self, size=None):
+        size = self.arraysize if size is None else size
+        started = time.perf_counter()
+        rows = super().fetchmany(size)
+        self._fetched(started, len(rows) < size)
+        return rows
+
+    def fetchall(self):
+        started = time.perf_counter()
+        rows = super().fetchall()
+        self._fetched(started, True)
+        return rows
+
+    def __next__(self):
+        started = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._fetched(started, True)
+            raise
+        self._fetched(started, False)
+        return row
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        self._finish()
+
+    def _start(self, sql, parameters, many, started):
+        self._sql, self._parameters, self._many = sql, parameters, many
+        self._elapsed = time.perf_counter() - started
+        if self.description is None:
+            self._finish()  # No rows to fetch (DML, DDL, failed statements)
+
+    def _fetched(self, started, done):
+        if self._sql is not None:
+            self._elapsed += time.perf_counter() - started
+            if done:
+                self._finish()
+
+    def _finish(self):
+        sql, self._sql = self._sql, None
+        if sql is not None:
+            metrics.record_sql(sql, self._elapsed)
+            slowlog.record(self.connection, sql, self._parameters, self._elapsed, many=self._many)
+
+
+class TracedConnection(sqlite3.Connection):
+    """Connection that reports each statement's execute and fetch time to
+    metrics and the slow-query log"""
+
+    def execute(self, sql, parameters=()):
+        return self._traced_cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self._traced_cursor().executemany(sql, seq_of_parameters)
+
+    def _traced_cursor(self):
+        # Not an override of cursor(), which the untraced
+        # sqlite3.Connection.execute used by slowlog's EXPLAIN also calls
+        cursor = TracedCursor(self)
+        cursor.row_factory = self.row_factory
+        return cursor
+
+
+def connect(database=DEFAULT_DATABASE):
+    """Open a new tuned SQLite connection"""
+    directory = os.path.dirname(database)
+    if directory and directory not in _created_dirs:
+        os.makedirs(directory, exist_ok=True)
+        _created_dirs.add(directory)
+
+    conn = sqlite3.connect(database, timeout=5.0, factory=_factory())
+    conn.row_factory = sqlite3.Row
+    for name, value in PRAGMAS:
+        conn.execute(f'PRAGMA {name} = {value}')
+    return conn
+
+
+def connect_readonly(database=DEFAULT_DATABASE):
+    """Open a tuned read-only SQLite connection
+
+    mode=ro opens the file read-only, so the connection can never take a
+    write lock. In WAL mode it reads the last committed snapshot and never
+    waits on the writer.
+    """
+    uri = f'file:{pathname2url(os.path.abspath(database))}?mode=ro'
+    conn = sqlite3.connect(uri, uri=True, timeout=5.0, factory=_factory())
+    conn.row_factory = sqlite3.Row
+    for name, value in READONLY_PRAGMAS:
+        conn.execute(f'PRAGMA {name} = {value}')
+    return conn
+
+
+def _factory():
+    traced = metrics.ENABLED or slowlog.THRESHOLD_MS >= 0
+    return TracedConnection if traced else sqlite3.Connection
+
+
+def _thread_connections():
+    """Connections owned by the current thread, reset after a fork"""
+    pid = os.getpid()
+    if getattr(_local, 'pid', None) != pid:
+        # Never share a connection inherited from a pre-fork parent
+        _local.pid = pid
+        _local.connections = {}
+    return _local.connections
+
+
+def _thread_connection(opener, database):
+    connections = _thread_connections()
+    key = (opener.__name__, database)
+    conn = connections.get(key)
+    if conn is None:
+        conn = connections[key] = opener(database)
+    return conn
+
+
+def get_db():
+    """Get the database connection for the current request
+
+    The connection is opened once per thread and reused across requests,
+    so pragmas and the page cache survive between requests. GET and HEAD
+    requests get the read-only connection from get_read_db.
+    """
+    if has_request_context() and request.method in READ_METHODS:
+        return get_read_db()
+    if 'db' not in g:
+        g.db = _thread_connection(connect, current_app.config['DATABASE'])
+    return g.db
+
+
+def get_read_db():
+    """Get the read-only connection for the current request
+
+    Pooled per thread like get_db, but separately, so reads never share
+    a connection with writes.
+    """
+    if 'read_db' not in g:
+        g.read_db = _thread_connection(connect_readonly, current_app.config['DATABASE'])
+    return g.read_db
+
+
+def close_db(exception=None):
+    """Release the request's connections back to their thread"""
+    for name in ('db', 'read_db'):
+        conn = g.pop(name, None)
+        if conn is not None and conn.in_transaction:
+            # Don't leak an open transaction into the next request
+            conn.rollback()
+
+
+def close_thread_connections():
+    """Close every connection held by the current thread"""
+    connections = _thread_connections()
+    for conn in connections.values():
+        conn.close()
+    connections.clear()
+
+
+def init_app(app):
+    """Register the connection layer on a Flask app"""
+    app.config.setdefault('DATABASE', DEFAULT_DATABASE)
+    app.teardown_appcontext(close_db)
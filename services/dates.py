@@ -0,0 +1,60 @@
+import calendar
+from datetime import datetime
+from functools import lru_cache
+
+from flask import g, has_request_context
+
+DATE_CACHE_SIZE = 16384
+
+LONG_FORMAT = '%B %d, %Y at %I:%M %p'
+SHORT_FORMAT = '%m/%d/%Y %I:%M %p'
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def parse_date(value):
+    """Parse a stored ISO date once; None when it is not a date
+
+    Offset-aware values are converted to naive local time so they compare
+    with the naive dates the forms store.
+    """
+    if isinstance(value, datetime):
+        parsed = value
+    else:
+        try:
+            parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except (AttributeError, TypeError, ValueError):
+            return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def format_date(value, date_format=LONG_FORMAT):
+    """Display string for a stored date, or the value itself if unparseable"""
+    parsed = parse_date(value)
+    return parsed.strftime(date_format) if parsed is not None else value
+
+
+def request_now():
+    """One `now` per request, so every row of a page agrees on past/upcoming"""
+    if not has_request_context():
+        return datetime.now()
+    if 'now' not in g:
+        g.now = datetime.now()
+    return g.now
+
+
+def is_past(value):
+    """True if a stored date is before this request's now"""
+    parsed = parse_date(value)
+    return parsed is not None and parsed < request_now()
+
+
+def to_epoch(value):
+    """Seconds since the epoch for a naive wall-clock datetime
+
+    Matches the starts_at column, which SQLite generates with
+    strftime('%s', date) and so also reads stored dates as UTC.
+    """
+    return calendar.timegm(value.timetuple())
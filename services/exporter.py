@@ -0,0 +1,45 @@
+import csv
+import io
+import json
+
+EXPORT_COLUMNS = ('id', 'title', 'description', 'date', 'location', 'status', 'created_at', 'updated_at')
+CHUNK_ROWS = 500
+
+
+def iter_event_rows(conn, sql_parts=(), params=()):
+    """Yield filtered events in date order, CHUNK_ROWS at a time
+
+    Rows are pulled from the cursor with fetchmany, never fetchall, so a
+    full-table export holds one chunk in memory.
+    """
+    sql = f"SELECT {', '.join(EXPORT_COLUMNS)} FROM events e"
+    if sql_parts:
+        sql += f" WHERE {' AND '.join(sql_parts)}"
+    cursor = conn.execute(sql + " ORDER BY e.starts_at, e.id", list(params))
+    try:
+        while True:
+            rows = cursor.fetchmany(CHUNK_ROWS)
+            if not rows:
+                break
+            yield rows
+    finally:
+        cursor.close()
+
+
+def ndjson_chunks(conn, sql_parts=(), params=()):
+    """One JSON object per line"""
+    for rows in iter_event_rows(conn, sql_parts, params):
+        yield ''.join(json.dumps(dict(row), ensure_ascii=False) + '\n' for row in rows)
+
+
+def csv_chunks(conn, sql_parts=(), params=()):
+    """CSV with a header row, which is sent before the query runs"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    yield buffer.getvalue()
+    for rows in iter_event_rows(conn, sql_parts, params):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(rows)
+        yield buffer.getvalue()
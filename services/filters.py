@@ -0,0 +1,29 @@
+from datetime import datetime, timedelta
+
+from services.dates import to_epoch
+
+
+def event_filters(status='', date_from='', date_to=''):
+    """SQL conditions and params for the status and date range filters
+
+    Conditions use the `e` alias for the events table. The date range only
+    applies when both ends are given, covers whole days and runs on the
+    indexed starts_at column; an unparseable date is ignored.
+    """
+    sql_parts = []
+    params = []
+
+    if status:
+        sql_parts.append("e.status = ?")
+        params.append(status)
+
+    if date_from and date_to:
+        try:
+            start = datetime.strptime(date_from, '%Y-%m-%d')
+            end = datetime.strptime(date_to, '%Y-%m-%d') + timedelta(days=1)
+            sql_parts.append("e.starts_at >= ? AND e.starts_at < ?")
+            params.extend([to_epoch(start), to_epoch(end)])
+        except ValueError:
+            pass  # Invalid date format, ignore filter
+
+    return sql_parts, params
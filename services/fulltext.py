@@ -0,0 +1,110 @@
+import re
+from markupsafe import Markup, escape
+
+# bm25 weights per FTS column: title, description, location
+COLUMN_WEIGHTS = (10.0, 1.0, 5.0)
+SEARCH_COLUMNS = ('title', 'description', 'location')
+
+# Control characters never appear in event text, so highlight() can mark
+# matches with them and we escape the text before swapping in <mark> tags
+_MARK_OPEN = '\x02'
+_MARK_CLOSE = '\x03'
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+MIGRATION = (
+    '''
+    CREATE VIRTUAL TABLE IF NOT EXISTS events_fts USING fts5(
+        title, description, location,
+        content='events', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS events_fts_insert AFTER INSERT ON events BEGIN
+        INSERT INTO events_fts (rowid, title, description, location)
+        VALUES (new.id, new.title, new.description, new.location);
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS events_fts_delete AFTER DELETE ON events BEGIN
+        INSERT INTO events_fts (events_fts, rowid, title, description, location)
+        VALUES ('delete', old.id, old.title, old.description, old.location);
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS events_fts_update
+    AFTER UPDATE OF title, description, location ON events BEGIN
+        INSERT INTO events_fts (events_fts, rowid, title, description, location)
+        VALUES ('delete', old.id, old.title, old.description, old.location);
+        INSERT INTO events_fts (rowid, title, description, location)
+        VALUES (new.id, new.title, new.description, new.location);
+    END
+    ''',
+    "INSERT INTO events_fts (events_fts, rank) VALUES ('rank', 'bm25({}, {}, {})')".format(*COLUMN_WEIGHTS),
+    # Backfill rows that existed before the index
+    "INSERT INTO events_fts (events_fts) VALUES ('rebuild')",
+)
+
+
+def build_match_query(query, search_type='all'):
+    """Turn free user text into a safe FTS5 MATCH expression
+
+    Every word becomes a quoted prefix term and all terms must match, so
+    the user cannot inject FTS operators. Returns None if there are no
+    searchable words.
+    """
+    terms = [f'"{token}"*' for token in _TOKEN_RE.findall(query)]
+    if not terms:
+        return None
+    if search_type in SEARCH_COLUMNS:
+        return ' AND '.join(f'{search_type} : {term}' for term in terms)
+    return ' AND '.join(terms)
+
+
+def render_highlight(text):
+    """Escape highlighted FTS output and mark matches with <mark>"""
+    if text is None:
+        return None
+    html = str(escape(text))
+    return Markup(html.replace(_MARK_OPEN, '<mark>').replace(_MARK_CLOSE, '</mark>'))
+
+
+def search_events(conn, query, search_type='all', filters=(), params=(), limit=None):
+    """Rank events matching a text query with BM25
+
+    `filters` are extra SQL conditions on the events table (aliased `e`)
+    with their `params`. Returns dicts carrying the event columns plus
+    `title_html`, `location_html` and `snippet_html` with matches marked.
+    """
+    match = build_match_query(query, search_type)
+    if match is None:
+        return []
+
+    sql = f'''
+        SELECT e.*,
+               highlight(events_fts, 0, '{_MARK_OPEN}', '{_MARK_CLOSE}') AS title_hl,
+               highlight(events_fts, 2, '{_MARK_OPEN}', '{_MARK_CLOSE}') AS location_hl,
+               snippet(events_fts, 1, '{_MARK_OPEN}', '{_MARK_CLOSE}', '…', 16) AS snippet_hl
+        FROM events_fts
+        JOIN events e ON e.id = events_fts.rowid
+        WHERE events_fts MATCH ?
+    '''
+    all_params = [match]
+    for condition in filters:
+        sql += f' AND {condition}'
+    all_params.extend(params)
+    sql += ' ORDER BY rank'
+    if limit is not None:
+        sql += ' LIMIT ?'
+        all_params.append(limit)
+
+    results = []
+    for row in conn.execute(sql, all_params):
+        event = dict(row)
+        event['title_html'] = render_highlight(event.pop('title_hl'))
+        event['location_html'] = render_highlight(event.pop('location_hl'))
+        event['snippet_html'] = render_highlight(event.pop('snippet_hl'))
+        results.append(event)
+    return results
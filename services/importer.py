@@ -0,0 +1,117 @@
+import csv
+import json
+import os
+
+from services.cache import response_cache
+from services.suggestions import suggestion_index
+from services.validation import validate_event
+
+DEFAULT_BATCH_SIZE = 500
+MAX_REJECTED_KEPT = 100
+# Largest upload the API imports inside a request; bigger files go through
+# `flask import-events`, which has no cap
+MAX_UPLOAD_BYTES = int(os.getenv('IMPORT_MAX_BYTES', 10 * 1024 * 1024))
+FORMATS = ('csv', 'ndjson')
+
+INSERT_SQL = '''
+    INSERT INTO events (title, description, date, location, status)
+    VALUES (?, ?, ?, ?, ?)
+'''
+
+
+def detect_format(filename=None, content_type=None):
+    """Guess csv or ndjson from a file name or content type"""
+    extension = os.path.splitext(filename or '')[1].lower().lstrip('.')
+    if extension in ('ndjson', 'jsonl'):
+        return 'ndjson'
+    if extension == 'csv':
+        return 'csv'
+    content_type = (content_type or '').lower()
+    if 'ndjson' in content_type or 'jsonl' in content_type:
+        return 'ndjson'
+    if 'csv' in content_type:
+        return 'csv'
+    return None
+
+
+def _lines(stream):
+    """Decode a binary stream line by line, dropping a UTF-8 BOM"""
+    first = True
+    for raw in stream:
+        line = raw.decode('utf-8', errors='replace') if isinstance(raw, bytes) else raw
+        if first:
+            line = line.lstrip('\ufeff')
+            first = False
+        yield line
+
+
+def read_csv(stream):
+    """Yield (line number, fields, error) for each CSV record
+
+    The first row is the header; columns match the events table.
+    """
+    reader = csv.DictReader(_lines(stream))
+    try:
+        for fields in reader:
+            yield reader.line_num, fields, None
+    except csv.Error as e:
+        yield reader.line_num, None, f'Malformed CSV: {e}'
+
+
+def read_ndjson(stream):
+    """Yield (line number, fields, error) for each JSON line"""
+    for line_number, line in enumerate(_lines(stream), 1):
+        if not line.strip():
+            continue
+        try:
+            fields = json.loads(line)
+        except ValueError as e:
+            yield line_number, None, f'Invalid JSON: {e}'
+            continue
+        if not isinstance(fields, dict):
+            yield line_number, None, 'Each line must be a JSON object'
+            continue
+        yield line_number, fields, None
+
+
+READERS = {'csv': read_csv, 'ndjson': read_ndjson}
+
+
+def import_events(conn, stream, file_format, batch_size=DEFAULT_BATCH_SIZE):
+    """Stream events from a CSV/NDJSON file into the events table
+
+    Rows are validated like the add form and inserted with executemany,
+    one transaction per batch_size rows, so memory stays flat whatever
+    the file size. Returns counts and the first rejected rows.
+    """
+    result = {'imported': 0, 'rejected': 0, 'errors': []}
+    batch = []
+
+    def flush():
+        with conn:
+            conn.executemany(INSERT_SQL, batch)
+        result['imported'] += len(batch)
+        response_cache.invalidate()
+        batch.clear()
+
+    try:
+        for line_number, fields, error in READERS[file_format](stream):
+            if error is None:
+                try:
+                    batch.append(validate_event(fields))
+                except ValueError as e:
+                    error = str(e)
+            if error is not None:
+                result['rejected'] += 1
+                if len(result['errors']) < MAX_REJECTED_KEPT:
+                    result['errors'].append({'line': line_number, 'error': error})
+                continue
+            if len(batch) >= batch_size:
+                flush()
+        if batch:
+            flush()
+    finally:
+        if result['imported']:
+            # Cheaper to rebuild once than to insort every imported row
+            suggestion_index.reset()
+    return result
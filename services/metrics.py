@@ -0,0 +1,144 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+
+from flask import Response, g, has_request_context, request
+
+ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() not in ('0', 'false', 'no')
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SQL_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5, 1.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+AI_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus text format
+
+    Kept in-process and dependency free. Each gunicorn worker exposes
+    its own series; scrape every worker or aggregate by instance.
+    """
+
+    def __init__(self, name, help_text, labelnames, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def observe(self, labels, value):
+        """Record value for a tuple of label values"""
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # Per-bucket (non-cumulative) counts, then sum and count
+                series = self._series[labels] = [[0] * len(self.buckets), 0.0, 0]
+            position = bisect_left(self.buckets, value)
+            if position < len(self.buckets):
+                series[0][position] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            snapshot = [(labels, list(counts), total, count)
+                        for labels, (counts, total, count) in sorted(self._series.items())]
+        for labels, counts, total, count in snapshot:
+            label_text = ','.join(f'{name}="{_escape(value)}"'
+                                  for name, value in zip(self.labelnames, labels))
+            prefix = label_text + ',' if label_text else ''
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{{prefix}le="+Inf"}} {count}')
+            lines.append(f'{self.name}_sum{{{label_text}}} {total}')
+            lines.append(f'{self.name}_count{{{label_text}}} {count}')
+        return lines
+
+
+REQUEST_SECONDS = Histogram(
+    'http_request_duration_seconds', 'Wall time per request until the response is returned',
+    ('blueprint', 'endpoint', 'method', 'status'))
+REQUEST_SQL_STATEMENTS = Histogram(
+    'http_request_sql_statements', 'SQL statements executed per request',
+    ('blueprint', 'endpoint'), COUNT_BUCKETS)
+REQUEST_SQL_SECONDS = Histogram(
+    'http_request_sql_seconds', 'Total SQL execute time per request',
+    ('blueprint', 'endpoint'), SQL_BUCKETS)
+SQL_STATEMENT_SECONDS = Histogram(
+    'sql_statement_duration_seconds', 'Execute time of each SQL statement',
+    ('endpoint', 'operation'), SQL_BUCKETS)
+AI_CALL_SECONDS = Histogram(
+    'ai_call_duration_seconds', 'Wall time of OpenAI API calls',
+    ('operation', 'outcome'), AI_BUCKETS)
+
+HISTOGRAMS = (REQUEST_SECONDS, REQUEST_SQL_STATEMENTS, REQUEST_SQL_SECONDS,
+              SQL_STATEMENT_SECONDS, AI_CALL_SECONDS)
+
+
+def _operation(sql):
+    """First keyword of a statement: SELECT, INSERT, PRAGMA, ..."""
+    words = sql.split(None, 1)
+    return words[0].upper() if words else ''
+
+
+def record_sql(sql, elapsed):
+    """Called by the traced connection after each statement"""
+    if has_request_context():
+        endpoint = request.endpoint or 'unknown'
+        g.sql_statements = g.get('sql_statements', 0) + 1
+        g.sql_seconds = g.get('sql_seconds', 0.0) + elapsed
+    else:
+        endpoint = 'background'
+    SQL_STATEMENT_SECONDS.observe((endpoint, _operation(sql)), elapsed)
+
+
+def record_ai_call(operation, elapsed, outcome):
+    AI_CALL_SECONDS.observe((operation, outcome), elapsed)
+
+
+def _start_timer():
+    g.request_started = time.perf_counter()
+
+
+def _record_request(response):
+    started = g.pop('request_started', None)
+    if started is not None:
+        endpoint = request.endpoint or 'unknown'
+        blueprint = request.blueprint or 'app'
+        REQUEST_SECONDS.observe(
+            (blueprint, endpoint, request.method, str(response.status_code)),
+            time.perf_counter() - started
+        )
+        REQUEST_SQL_STATEMENTS.observe((blueprint, endpoint), g.get('sql_statements', 0))
+        REQUEST_SQL_SECONDS.observe((blueprint, endpoint), g.get('sql_seconds', 0.0))
+    return response
+
+
+def render_metrics():
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines.extend(histogram.render())
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_view():
+    """Prometheus scrape endpoint"""
+    return Response(render_metrics(), mimetype='text/plain; version=0.0.4')
+
+
+def init_app(app):
+    """Time every request and expose /metrics"""
+    if not ENABLED:
+        return
+    app.before_request(_start_timer)
+    app.after_request(_record_request)
+    app.add_url_rule('/metrics', 'metrics', metrics_view)
@@ -0,0 +1,170 @@
+from services import ai_jobs, bulk_enhance, conditional, fulltext, stats
+
+# Each entry moves the schema forward by one version. Entries are either a
+# tuple of SQL statements or a callable taking the connection. Never edit a
+# migration that has shipped - append a new one instead. Migrations do not
+# ANALYZE: statistics gathered while the table is tiny stay behind as it
+# grows and steer the planner to full scans, while without sqlite_stat1 it
+# assumes the indexes are selective.
+MIGRATIONS = [
+    # 1: baseline events table
+    (
+        '''
+        CREATE TABLE IF NOT EXISTS events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL,
+            description TEXT,
+            date TEXT NOT NULL,
+            location TEXT,
+            status TEXT DEFAULT 'upcoming',
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+        ''',
+    ),
+    # 2: indexes for the dashboard, list and status filter queries
+    (
+        'CREATE INDEX IF NOT EXISTS idx_events_date ON events (date)',
+        'CREATE INDEX IF NOT EXISTS idx_events_status_date ON events (status, date)',
+    ),
+    # 3: FTS5 index over title, description and location
+    fulltext.MIGRATION,
+    # 4: trigger-maintained per-status counters
+    stats.MIGRATION,
+    # 5: global data revision behind ETag / Last-Modified
+    conditional.MIGRATION,
+    # 6: integer epoch start time for upcoming/past/range queries. Stored
+    # dates are naive wall-clock times, so they are read as UTC here and
+    # compared against dates.to_epoch(now), which does the same. A virtual
+    # generated column costs inserts nothing beyond its index entries.
+    (
+        '''
+        ALTER TABLE events ADD COLUMN starts_at INTEGER
+        GENERATED ALWAYS AS (CAST(strftime('%s', date) AS INTEGER)) VIRTUAL
+        ''',
+        'CREATE INDEX IF NOT EXISTS idx_events_starts_at ON events (starts_at)',
+        'CREATE INDEX IF NOT EXISTS idx_events_status_starts_at ON events (status, starts_at)',
+    ),
+    # 7: persistent queue of AI parsing jobs
+    ai_jobs.MIGRATION,
+    # 8: bulk description job progress, readable from every worker
+    bulk_enhance.MIGRATION,
+]
+
+# Query shapes served by the routes, checked by `flask check-indexes`.
+# tests/test_indexes.py drives the routes and fails when this list and
+# the statements they run drift apart.
+HOT_QUERIES = {
+    'index.recent_events': ('SELECT * FROM events ORDER BY date DESC LIMIT 5', ()),
+    'stats.upcoming_count': ('SELECT COUNT(*) FROM events WHERE starts_at >= ?', (1717200000,)),
+    'events.list_events': ('SELECT * FROM events ORDER BY date DESC, id DESC LIMIT ?', (21,)),
+    'events.list_events.status': (
+        'SELECT * FROM events WHERE status = ? ORDER BY date DESC, id DESC LIMIT ?',
+        ('upcoming', 21),
+    ),
+    'events.list_events.next': (
+        'SELECT * FROM events WHERE (date, id) < (?, ?) ORDER BY date DESC, id DESC LIMIT ?',
+        ('2024-06-01T00:00:00', 10, 21),
+    ),
+    'events.list_events.prev': (
+        'SELECT * FROM events WHERE (date, id) > (?, ?) ORDER BY date ASC, id ASC LIMIT ?',
+        ('2024-06-01T00:00:00', 10, 21),
+    ),
+    'events.list_events.status_next': (
+        'SELECT * FROM events WHERE status = ? AND (date, id) < (?, ?) '
+        'ORDER BY date DESC, id DESC LIMIT ?',
+        ('upcoming', '2024-06-01T00:00:00', 10, 21),
+    ),
+    'events.list_events.status_prev': (
+        'SELECT * FROM events WHERE status = ? AND (date, id) > (?, ?) '
+        'ORDER BY date ASC, id ASC LIMIT ?',
+        ('upcoming', '2024-06-01T00:00:00', 10, 21),
+    ),
+    'events.get_event': ('SELECT * FROM events WHERE id = ?', (1,)),
+    'events.export': (
+        'SELECT id, title, description, date, location, status, created_at, updated_at '
+        'FROM events e ORDER BY e.starts_at, e.id',
+        (),
+    ),
+    'events.export.status': (
+        'SELECT id, title, description, date, location, status, created_at, updated_at '
+        'FROM events e WHERE e.status = ? ORDER BY e.starts_at, e.id',
+        ('upcoming',),
+    ),
+    'events.export.date_range': (
+        'SELECT id, title, description, date, location, status, created_at, updated_at '
+        'FROM events e WHERE e.starts_at >= ? AND e.starts_at < ? ORDER BY e.starts_at, e.id',
+        (1704067200, 1735689600),
+    ),
+    'search.status': (
+        'SELECT * FROM events e WHERE e.status = ? ORDER BY e.starts_at DESC', ('upcoming',),
+    ),
+    'search.date_range': (
+        'SELECT * FROM events e WHERE e.starts_at >= ? AND e.starts_at < ? ORDER BY e.starts_at DESC',
+        (1704067200, 1735689600),
+    ),
+    'search.status_date_range': (
+        'SELECT * FROM events e WHERE e.status = ? AND e.starts_at >= ? AND e.starts_at < ? '
+        'ORDER BY e.starts_at DESC',
+        ('upcoming', 1704067200, 1735689600),
+    ),
+}
+
+
+def schema_version(conn):
+    """Return the schema version stored in the database"""
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+
+def migrate(conn):
+    """Apply every pending migration, one transaction per version"""
+    current = schema_version(conn)
+    for version, migration in enumerate(MIGRATIONS, start=1):
+        if version <= current:
+            continue
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            # Another process may have migrated while we waited for the lock
+            if schema_version(conn) >= version:
+                conn.rollback()
+                continue
+            if callable(migration):
+                migration(conn)
+            else:
+                for statement in migration:
+                    conn.execute(statement)
+            conn.execute(f'PRAGMA user_version = {version}')
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    return schema_version(conn)
+
+
+def query_plan(conn, sql, params=()):
+    """Return the EXPLAIN QUERY PLAN detail lines for a statement"""
+    rows = conn.execute(f'EXPLAIN QUERY PLAN {sql}', params).fetchall()
+    return [row[3] for row in rows]
+
+
+def unindexed_queries(conn):
+    """Return the hot queries whose plan scans the events table or sorts"""
+    problems = {}
+    for name, (sql, params) in HOT_QUERIES.items():
+        plan = query_plan(conn, sql, params)
+        if is_unindexed(plan):
+            problems[name] = plan
+    return problems
+
+
+def is_unindexed(plan):
+    """True when a plan scans a table without an index or sorts"""
+    return any(_is_full_scan(line) or 'TEMP B-TREE' in line for line in plan)
+
+
+def _is_full_scan(detail):
+    """True for a plan line that scans a table without an index
+
+    Aliased tables show up under their alias ("SCAN e").
+    """
+    return detail.startswith('SCAN ') and 'INDEX' not in detail
@@ -0,0 +1,272 @@
+import re
+from datetime import datetime, timedelta
+
+DEFAULT_HOUR = 9
+TONIGHT_HOUR = 19
+
+WEEKDAYS = {
+    'monday': 0, 'tuesday': 1, 'tues': 1, 'wednesday': 2, 'thursday': 3,
+    'thurs': 3, 'friday': 4, 'saturday': 5, 'sunday': 6,
+}
+DAY_OFFSETS = {'today': 0, 'tonight': 0, 'tomorrow': 1, 'tmrw': 1}
+NAMED_TIMES = {'noon': (12, 0), 'midnight': (0, 0)}
+MERIDIEMS = {'am': 0, 'a.m.': 0, 'a.m': 0, 'pm': 12, 'p.m.': 12, 'p.m': 12}
+LOCATION_PREPS = frozenset(('in', 'at', '@'))
+KEYWORDS = frozenset(
+    set(WEEKDAYS) | set(DAY_OFFSETS) | set(NAMED_TIMES) | LOCATION_PREPS | {'next', 'on', 'this'}
+)
+
+# Time- and date-shaped words, precompiled once: "3pm", "3:30p.m.", "14:30",
+# "2024-07-01". Everything else is classified by set lookups.
+_CLOCK_RE = re.compile(r'(\d{1,2})(?::(\d{2}))?([ap])\.?m\.?$|(\d{1,2}):(\d{2})$')
+_ISO_DATE_RE = re.compile(r'\d{4}-\d{2}-\d{2}$')
+_BARE_HOUR_RE = re.compile(r'\d{1,2}$')
+
+_WORD_PUNCT = ',;:!?()'
+_EDGE_JUNK = ' \t,.;:-'
+_TRAILING_WORDS = frozenset(('on', 'at', 'in', 'for', 'by'))
+
+
+def _clean(words):
+    """Join words, trim punctuation and dangling prepositions"""
+    words = list(words)
+    while words and words[-1].lower().strip(_EDGE_JUNK) in _TRAILING_WORDS:
+        words.pop()
+    return ' '.join(words).strip(_EDGE_JUNK)
+
+
+# Returned by _clock for a time-shaped word out of range ("25:00", "7:75pm")
+INVALID_TIME = object()
+
+
+def _meridiem_clock(hour, minute, offset, width):
+    if not 1 <= hour <= 12 or minute > 59:
+        return INVALID_TIME
+    return hour % 12 + offset, minute, width
+
+
+def _clock(word, next_word):
+    """(hour, minute, words consumed) if word starts a clock time
+
+    Returns INVALID_TIME for a clock time whose hour or minute is out of range.
+    """
+    digits = word.lstrip('@')
+    if digits.isdigit():
+        if len(digits) <= 2 and next_word in MERIDIEMS:
+            # "8 pm", "8 p.m."
+            return _meridiem_clock(int(digits), 0, MERIDIEMS[next_word], 2)
+        return None
+    if len(digits) <= 4 and digits[-2:] in MERIDIEMS and digits[:-2].isdigit():
+        # "3pm", "11am" - the common shape, no regex needed
+        return _meridiem_clock(int(digits[:-2]), 0, MERIDIEMS[digits[-2:]], 1)
+    match = _CLOCK_RE.match(digits)
+    if match is None:
+        return None
+    if match.group(1):
+        return _meridiem_clock(int(match.group(1)), int(match.group(2) or 0),
+                               12 if match.group(3) == 'p' else 0, 1)
+    hour, minute = int(match.group(4)), int(match.group(5))
+    if hour > 23 or minute > 59:
+        return INVALID_TIME
+    return hour, minute, 1
+
+
+def tokenize(text):
+    """Extract date, time, title and location from event text in one pass
+
+    Scans the words once, left to right. Returns a dict with `title`,
+    `location`, `date` (an explicit YYYY-MM-DD date or None),
+    `day_offset` (days from today, or None), `weekday` (0-6 or None),
+    `time` ((hour, minute) or None), `invalid_time` (an out-of-range clock
+    word, or None) and `tonight`.
+    """
+    words = text.split()
+    keys = text.lower().split()
+    count = len(keys)
+    date = day_offset = weekday = clock = invalid_time = None
+    tonight = False
+    first_token = None
+    prep_end = location = None
+    token_spans = []
+
+    i = 0
+    while i < count:
+        key = keys[i]
+        if key[-1] in _WORD_PUNCT:
+            key = key.rstrip(_WORD_PUNCT) or key
+        if key not in KEYWORDS and not key[0].isdigit() and key[0] != '@':
+            # Plain word: the common case costs one set lookup
+            i += 1
+            continue
+        following = keys[i + 1].rstrip(_WORD_PUNCT) if i + 1 < count else ''
+        width = 0
+
+        if key in DAY_OFFSETS:
+            day_offset = DAY_OFFSETS[key]
+            tonight = key == 'tonight'
+            width = 1
+        elif key in WEEKDAYS:
+            weekday, day_offset, width = WEEKDAYS[key], None, 1
+        elif key == 'next' and following == 'week':
+            width = 2
+            if weekday is None and day_offset is None:
+                day_offset = 7
+        elif key == 'next' and following in WEEKDAYS:
+            # Any other "next" ("next quarter", "Next steps") is a plain word
+            weekday, day_offset, width = WEEKDAYS[following], None, 2
+        elif key in ('on', 'this') and following in WEEKDAYS:
+            weekday, day_offset, width = WEEKDAYS[following], None, 2
+        elif key == 'on' and _ISO_DATE_RE.match(following):
+            date, width = following, 2
+        elif key in NAMED_TIMES:
+            clock, width = NAMED_TIMES[key], 1
+        elif key in LOCATION_PREPS:
+            after = keys[i + 2].rstrip(_WORD_PUNCT) if i + 2 < count else ''
+            found = (NAMED_TIMES[following] + (1,)) if following in NAMED_TIMES else _clock(following, after)
+            if found is INVALID_TIME:
+                invalid_time, width = following, 2
+            elif found:
+                clock, width = found[:2], found[2] + 1
+            elif (key != 'in' and _BARE_HOUR_RE.match(following) and int(following) <= 23
+                    and after != '-'):
+                # "at 7" means the evening, as the old parser assumed
+                hour = int(following)
+                clock, width = (hour + 12 if 1 <= hour <= 11 else hour % 24, 0), 2
+        elif key[0].isdigit() or key[0] == '@':
+            if _ISO_DATE_RE.match(key):
+                date, width = key, 1
+            else:
+                found = _clock(key, following)
+                if found is INVALID_TIME:
+                    invalid_time, width = key, 1
+                elif found:
+                    clock, width = found[:2], found[2]
+
+        if width:
+            if first_token is None:
+                first_token = i
+            # A preposition's object runs until the next token
+            if prep_end is not None:
+                if i > prep_end:
+                    location = (prep_end, i)
+                prep_end = None
+            token_spans.append((i, i + width))
+            i += width
+        elif key in LOCATION_PREPS:
+            if first_token is None:
+                first_token = i
+            if prep_end is not None and i > prep_end:
+                location = (prep_end, i)
+            if location is None:
+                prep_end = i + 1
+            token_spans.append((i, i + 1))
+            i += 1
+        else:
+            i += 1
+
+    if prep_end is not None and location is None and prep_end < count:
+        location = (prep_end, count)
+
+    if date is not None:
+        try:
+            date = datetime.strptime(date, '%Y-%m-%d')
+        except ValueError:
+            date = None
+
+    title = _clean(words[:first_token] if first_token is not None else words)
+    if not title:
+        # Input starts with a date ("Saturday hike"): drop tokens and location
+        skip = set()
+        for start, end in token_spans + ([location] if location else []):
+            skip.update(range(start, end))
+        title = _clean(word for index, word in enumerate(words) if index not in skip)
+
+    return {
+        'title': title or None,
+        'location': (_clean(words[location[0]:location[1]]) or None) if location else None,
+        'date': date,
+        'day_offset': day_offset,
+        'weekday': weekday,
+        'time': clock,
+        'invalid_time': invalid_time,
+        'tonight': tonight,
+    }
+
+
+def resolve_date(tokens, now):
+    """Turn tokenized date/time parts into a datetime relative to now"""
+    if tokens['date'] is not None:
+        day = tokens['date']
+    elif tokens['weekday'] is not None:
+        days_ahead = tokens['weekday'] - now.weekday()
+        if days_ahead <= 0:
+            days_ahead += 7
+        day = now + timedelta(days=days_ahead)
+    elif tokens['day_offset'] is not None:
+        day = now + timedelta(days=tokens['day_offset'])
+    else:
+        day = None
+
+    if tokens['time'] is not None:
+        hour, minute = tokens['time']
+        base = day or now
+        event_date = base.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        if day is None and event_date < now:
+            # "Lunch at 1pm" after 1pm means tomorrow
+            event_date += timedelta(days=1)
+        return event_date
+
+    if day is None:
+        day = now + timedelta(days=1)
+    hour = TONIGHT_HOUR if tokens['tonight'] else DEFAULT_HOUR
+    event_date = day.replace(hour=hour, minute=0, second=0, microsecond=0)
+    if tokens['day_offset'] == 0 and event_date < now:
+        # Default time already passed today: next round hour instead
+        event_date = (now + timedelta(hours=1)).replace(minute=0, second=0, microsecond=0)
+    return event_date
+
+
+def parse_event_text(user_input, now=None):
+    """Keyword parser used when the model is unavailable
+
+    Returns the same result shape as AIService.parse_natural_language_event.
+    """
+    if not user_input or not user_input.strip():
+        return {
+            "success": False,
+            "error": "Please provide event details",
+            "needs_clarification": True,
+            "clarification_message": "Please describe your event"
+        }
+
+    now = now or datetime.now()
+    tokens = tokenize(user_input.strip())
+    if not tokens['title']:
+        return {
+            "success": False,
+            "error": "Could not extract event title from input",
+            "needs_clarification": True,
+            "clarification_message": "Please provide a clear event title"
+        }
+
+    if tokens['invalid_time']:
+        return {
+            "success": False,
+            "error": f"Invalid time: {tokens['invalid_time']}",
+            "needs_clarification": True,
+            "clarification_message": "Please provide a valid time"
+        }
+
+    title = tokens['title']
+    return {
+        "success": True,
+        "event_data": {
+            "title": title,
+            "description": f"Event: {title}",
+            "date": resolve_date(tokens, now),
+            "location": tokens['location'],
+            "status": "upcoming",
+            "needs_clarification": False,
+            "clarification_message": None
+        }
+    }
@@ -0,0 +1,94 @@
+import base64
+import json
+
+DEFAULT_PER_PAGE = 20
+MAX_PER_PAGE = 100
+
+
+def encode_cursor(date, event_id, direction='next'):
+    """Encode a (date, id) position as an opaque URL-safe token"""
+    raw = json.dumps([direction, date, event_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Decode a cursor token into (direction, date, id)
+
+    Raises ValueError for anything that is not a cursor we issued.
+    """
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        direction, date, event_id = json.loads(base64.urlsafe_b64decode(padded))
+    except Exception:
+        raise ValueError('Invalid cursor')
+    if direction not in ('next', 'prev') or not isinstance(date, str) or not isinstance(event_id, int):
+        raise ValueError('Invalid cursor')
+    return direction, date, event_id
+
+
+def clamp_per_page(per_page):
+    """Keep a requested page size within sane bounds"""
+    if not per_page or per_page < 1:
+        return DEFAULT_PER_PAGE
+    return min(per_page, MAX_PER_PAGE)
+
+
+class KeysetPage:
+    """One page of events ordered by (date, id) descending"""
+
+    def __init__(self, items, has_prev, has_next, per_page):
+        self.items = items
+        self.has_prev = has_prev
+        self.has_next = has_next
+        self.per_page = per_page
+
+    @property
+    def prev_cursor(self):
+        if not self.has_prev or not self.items:
+            return None
+        first = self.items[0]
+        return encode_cursor(first['date'], first['id'], 'prev')
+
+    @property
+    def next_cursor(self):
+        if not self.has_next or not self.items:
+            return None
+        last = self.items[-1]
+        return encode_cursor(last['date'], last['id'], 'next')
+
+
+def paginate_events(conn, status=None, cursor=None, per_page=DEFAULT_PER_PAGE):
+    """Fetch one page of events by seeking on (date, id)
+
+    Each page is a single index range scan of per_page + 1 rows, so the
+    cost does not grow with how deep the caller has paged.
+    """
+    per_page = clamp_per_page(per_page)
+    direction, position = 'next', None
+    if cursor:
+        direction, date, event_id = decode_cursor(cursor)
+        position = (date, event_id)
+
+    where, params = [], []
+    if status:
+        where.append('status = ?')
+        params.append(status)
+    if position:
+        where.append('(date, id) < (?, ?)' if direction == 'next' else '(date, id) > (?, ?)')
+        params.extend(position)
+
+    order = 'date DESC, id DESC' if direction == 'next' else 'date ASC, id ASC'
+    sql = 'SELECT * FROM events'
+    if where:
+        sql += f" WHERE {' AND '.join(where)}"
+    sql += f' ORDER BY {order} LIMIT ?'
+    params.append(per_page + 1)
+
+    rows = conn.execute(sql, params).fetchall()
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+
+    if direction == 'next':
+        return KeysetPage(rows, has_prev=position is not None, has_next=has_more, per_page=per_page)
+    rows.reverse()
+    return KeysetPage(rows, has_prev=has_more, has_next=True, per_page=per_page)
@@ -0,0 +1,137 @@
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from logging.handlers import RotatingFileHandler
+
+from flask import abort, current_app, has_request_context, jsonify, request
+
+# Statements slower than this are logged; a negative value turns it off
+THRESHOLD_MS = float(os.getenv('SLOW_QUERY_MS', 100))
+LOG_PATH = os.getenv('SLOW_QUERY_LOG', 'data/slow_queries.jsonl')
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUPS = 3
+RECENT_KEPT = 200
+
+EXPLAINABLE = ('SELECT', 'WITH', 'UPDATE', 'DELETE', 'INSERT')
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST_RE = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+_SPACE_RE = re.compile(r'\s+')
+
+_recent = deque(maxlen=RECENT_KEPT)
+_lock = threading.Lock()
+_logger = None
+
+
+def normalize_sql(sql):
+    """Collapse whitespace and literals so one query shape is one entry"""
+    sql = _STRING_RE.sub('?', sql)
+    sql = _NUMBER_RE.sub('?', sql)
+    sql = _IN_LIST_RE.sub('(?, ...)', sql)
+    return _SPACE_RE.sub(' ', sql).strip()
+
+
+def params_shape(parameters, many=False):
+    """Types of the bound parameters, never their values"""
+    if many:
+        return 'executemany'
+    if isinstance(parameters, dict):
+        return {name: type(value).__name__ for name, value in parameters.items()}
+    return [type(value).__name__ for value in parameters or ()]
+
+
+def full_scans(plan):
+    """Plan lines that read a whole table without an index"""
+    return [line for line in plan
+            if line.startswith('SCAN ') and 'INDEX' not in line and 'VIRTUAL TABLE' not in line]
+
+
+def _explain(conn, sql, parameters, many):
+    words = sql.split(None, 1)
+    if not words or words[0].upper() not in EXPLAINABLE:
+        return None
+    if many:
+        # The executemany rows are consumed by now, and EXPLAIN needs every
+        # placeholder bound; NULLs give the same plan shape
+        parameters = (None,) * sql.count('?')
+    try:
+        # The base class execute, so the EXPLAIN itself is not traced
+        rows = sqlite3.Connection.execute(conn, f'EXPLAIN QUERY PLAN {sql}', parameters).fetchall()
+    except Exception as e:
+        return [f'EXPLAIN failed: {e}']
+    return [row[3] for row in rows]
+
+
+def _file_logger():
+    global _logger
+    if _logger is None:
+        logger = logging.getLogger('slow_queries')
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+        if LOG_PATH:
+            directory = os.path.dirname(LOG_PATH)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            handler = RotatingFileHandler(LOG_PATH, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS)
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            logger.addHandler(handler)
+        _logger = logger
+    return _logger
+
+
+def record(conn, sql, parameters, elapsed, many=False):
+    """Called by the traced connection for every statement"""
+    if THRESHOLD_MS < 0 or elapsed * 1000 < THRESHOLD_MS:
+        return
+    plan = _explain(conn, sql, parameters, many)
+    scans = full_scans(plan or [])
+    entry = {
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'duration_ms': round(elapsed * 1000, 3),
+        'endpoint': request.endpoint if has_request_context() else 'background',
+        'sql': normalize_sql(sql),
+        'params': params_shape(parameters, many),
+        'plan': plan,
+        'full_scan': bool(scans),
+    }
+    with _lock:
+        _recent.append(entry)
+    logger = _file_logger()
+    if scans:
+        logger.warning(json.dumps(entry))
+    else:
+        logger.info(json.dumps(entry))
+
+
+def recent():
+    """Most recent slow statements, newest first"""
+    with _lock:
+        return list(reversed(_recent))
+
+
+def slow_queries_view():
+    """Dev-only view of the slow-query log"""
+    if not (current_app.debug or current_app.config.get('SLOW_QUERY_ENDPOINT')):
+        abort(404)
+    queries = recent()
+    if request.args.get('full_scan'):
+        queries = [entry for entry in queries if entry['full_scan']]
+    return jsonify({
+        'success': True,
+        'threshold_ms': THRESHOLD_MS,
+        'log_path': LOG_PATH,
+        'queries': queries
+    })
+
+
+def init_app(app):
+    """Expose /debug/slow-queries in debug mode or with SLOW_QUERY_ENDPOINT"""
+    app.config.setdefault('SLOW_QUERY_ENDPOINT',
+                          os.getenv('SLOW_QUERY_ENDPOINT', '').lower() in ('1', 'true', 'yes'))
+    app.add_url_rule('/debug/slow-queries', 'slow_queries', slow_queries_view)
@@ -0,0 +1,74 @@
+from datetime import datetime
+
+from services.dates import to_epoch
+
+VALID_STATUSES = ['upcoming', 'attending', 'maybe', 'declined']
+
+# Per-status row counts kept current by triggers, so totals never scan events
+MIGRATION = (
+    '''
+    CREATE TABLE IF NOT EXISTS event_counts (
+        status TEXT PRIMARY KEY,
+        count INTEGER NOT NULL DEFAULT 0
+    )
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS event_counts_insert AFTER INSERT ON events BEGIN
+        INSERT INTO event_counts (status, count) VALUES (COALESCE(new.status, ''), 1)
+        ON CONFLICT (status) DO UPDATE SET count = count + 1;
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS event_counts_delete AFTER DELETE ON events BEGIN
+        UPDATE event_counts SET count = count - 1 WHERE status = COALESCE(old.status, '');
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS event_counts_update AFTER UPDATE OF status ON events
+    WHEN COALESCE(old.status, '') != COALESCE(new.status, '') BEGIN
+        UPDATE event_counts SET count = count - 1 WHERE status = COALESCE(old.status, '');
+        INSERT INTO event_counts (status, count) VALUES (COALESCE(new.status, ''), 1)
+        ON CONFLICT (status) DO UPDATE SET count = count + 1;
+    END
+    ''',
+    'DELETE FROM event_counts',
+    '''
+    INSERT INTO event_counts (status, count)
+    SELECT COALESCE(status, ''), COUNT(*) FROM events GROUP BY COALESCE(status, '')
+    ''',
+)
+
+
+def get_event_stats(conn, now=None):
+    """Totals, upcoming/past split and per-status counts
+
+    Totals come from the trigger-maintained event_counts table. Upcoming
+    depends on the clock, so it is a range count on the starts_at index.
+    """
+    now = now or datetime.now()
+
+    by_status = {status: 0 for status in VALID_STATUSES}
+    total = 0
+    for row in conn.execute('SELECT status, count FROM event_counts WHERE count > 0'):
+        by_status[row['status']] = row['count']
+        total += row['count']
+
+    upcoming = conn.execute(
+        'SELECT COUNT(*) FROM events WHERE starts_at >= ?',
+        (to_epoch(now),)
+    ).fetchone()[0]
+
+    return {
+        'total': total,
+        'upcoming': upcoming,
+        'past': total - upcoming,
+        'by_status': by_status
+    }
+
+
+def count_events(conn, status=''):
+    """Number of events, optionally with one status, from event_counts"""
+    if status:
+        row = conn.execute('SELECT count FROM event_counts WHERE status = ?', (status,)).fetchone()
+        return row[0] if row else 0
+    return conn.execute('SELECT COALESCE(SUM(count), 0) FROM event_counts').fetchone()[0]
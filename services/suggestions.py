@@ -0,0 +1,164 @@
+import re
+import threading
+import time
+from bisect import bisect_left, insort
+from heapq import nlargest
+
+MAX_SUGGESTIONS = 8
+MIN_WORD_LENGTH = 3
+# Other workers' writes reach this process when the index is rebuilt,
+# which happens once it is this old and the data revision has moved on
+DEFAULT_MAX_AGE = 300
+
+_WORD_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def _title_entries(title):
+    """(key, display) pairs for each indexable word of a title"""
+    if not title:
+        return []
+    return [(word, word.title()) for word in _WORD_RE.findall(title.lower())
+            if len(word) >= MIN_WORD_LENGTH]
+
+
+def _location_entries(location):
+    """(key, display) pairs so a location matches from any word boundary"""
+    location = (location or '').strip()
+    if not location:
+        return []
+    lowered = location.lower()
+    return [(lowered[match.start():], location) for match in _WORD_RE.finditer(lowered)]
+
+
+class SuggestionIndex:
+    """Process-local prefix index over title words and locations
+
+    Keys live in a sorted list so a prefix lookup is a bisect plus a short
+    range walk. Each (key, display) pair carries how many events use it,
+    which is the suggestion's weight.
+    """
+
+    def __init__(self, max_age=DEFAULT_MAX_AGE):
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._rebuild_lock = threading.Lock()
+        self._keys = []
+        self._counts = {}
+        self._memo = {}
+        self._built_at = None
+        self._revision = None
+
+    def suggest(self, prefix, load_db, limit=MAX_SUGGESTIONS):
+        """Return the heaviest suggestions starting with prefix
+
+        load_db is only called when the index has to be (re)built.
+        """
+        prefix = prefix.strip().lower()
+        if not prefix:
+            return []
+        if self._is_stale():
+            self._refresh(load_db)
+
+        with self._lock:
+            cached = self._memo.get((prefix, limit))
+            if cached is not None:
+                return cached
+
+            # Spellings that differ only by case collapse into the heaviest one
+            best = {}
+            keys = self._keys
+            position = bisect_left(keys, (prefix,))
+            while position < len(keys) and keys[position][0].startswith(prefix):
+                key, display = keys[position]
+                position += 1
+                candidate = (self._counts[(key, display)], display)
+                folded = display.casefold()
+                if candidate > best.get(folded, (0, '')):
+                    best[folded] = candidate
+            result = [display for _, display in nlargest(limit, best.values())]
+            if len(self._memo) > 1024:
+                self._memo.clear()
+            self._memo[(prefix, limit)] = result
+            return result
+
+    def _is_stale(self):
+        built_at = self._built_at
+        return built_at is None or time.monotonic() - built_at > self.max_age
+
+    def _refresh(self, load_db):
+        """Rebuild a stale index, one caller at a time
+
+        Until the first build every caller waits for it; after that the
+        others keep answering from the old index instead of queueing up.
+        """
+        if not self._rebuild_lock.acquire(blocking=self._built_at is None):
+            return
+        try:
+            if not self._is_stale():
+                return  # Built by the caller we waited for
+            conn = load_db()
+            if self._revision is not None and _data_revision(conn) == self._revision:
+                with self._lock:
+                    self._built_at = time.monotonic()
+                return
+            self.rebuild(conn)
+        finally:
+            self._rebuild_lock.release()
+
+    def rebuild(self, conn):
+        """Rebuild the whole index from the events table"""
+        revision = _data_revision(conn)
+        counts = {}
+        for row in conn.execute('SELECT title, location FROM events'):
+            for entry in _title_entries(row['title']) + _location_entries(row['location']):
+                counts[entry] = counts.get(entry, 0) + 1
+        with self._lock:
+            self._counts = counts
+            self._keys = sorted(counts)
+            self._memo = {}
+            self._built_at = time.monotonic()
+            self._revision = revision
+
+    def add_event(self, title, location):
+        """Count a newly created event"""
+        self._apply(_title_entries(title) + _location_entries(location), 1)
+
+    def remove_event(self, title, location):
+        """Forget a deleted event"""
+        self._apply(_title_entries(title) + _location_entries(location), -1)
+
+    def update_event(self, old_title, old_location, title, location):
+        """Move an edited event's words and location"""
+        self.remove_event(old_title, old_location)
+        self.add_event(title, location)
+
+    def _apply(self, entries, delta):
+        with self._lock:
+            if self._built_at is None:
+                return  # Not built yet; the first lookup loads current data
+            for entry in entries:
+                count = self._counts.get(entry, 0) + delta
+                if count > 0:
+                    if entry not in self._counts:
+                        insort(self._keys, entry)
+                    self._counts[entry] = count
+                elif entry in self._counts:
+                    del self._counts[entry]
+                    del self._keys[bisect_left(self._keys, entry)]
+            self._memo = {}
+
+    def reset(self):
+        """Drop the index so the next lookup rebuilds it"""
+        with self._lock:
+            self._keys = []
+            self._counts = {}
+            self._memo = {}
+            self._built_at = None
+            self._revision = None
+
+
+def _data_revision(conn):
+    return conn.execute('SELECT revision FROM data_revision WHERE id = 1').fetchone()[0]
+
+
+suggestion_index = SuggestionIndex()
@@ -0,0 +1,44 @@
+from datetime import datetime
+
+from services.stats import VALID_STATUSES
+
+# The form's datetime-local value, plus the seconds our own exports carry
+DATE_FORMATS = ('%Y-%m-%dT%H:%M', '%Y-%m-%dT%H:%M:%S')
+
+
+def _text(value):
+    return str(value).strip() if value is not None else ''
+
+
+def parse_event_date(date_str):
+    """Parse a submitted event date or raise ValueError"""
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(date_str, date_format)
+        except ValueError:
+            pass
+    raise ValueError('Invalid date format')
+
+
+def validate_event(fields):
+    """Check submitted event fields and return the INSERT/UPDATE values
+
+    fields is any mapping (form data, a CSV row, a JSON object). Returns
+    (title, description, date, location, status) or raises ValueError
+    with the message shown to the user.
+    """
+    title = _text(fields.get('title'))
+    description = _text(fields.get('description'))
+    date_str = _text(fields.get('date'))
+    location = _text(fields.get('location'))
+    status = _text(fields.get('status')) or 'upcoming'
+
+    if not title:
+        raise ValueError('Event title is required')
+    if not date_str:
+        raise ValueError('Event date is required')
+    event_date = parse_event_date(date_str)
+    if status not in VALID_STATUSES:
+        raise ValueError(f'Invalid status: {status}')
+
+    return (title, description or None, event_date.isoformat(), location or None, status)
@@ -0,0 +1,58 @@
+import importlib
+import logging
+import time
+
+from services import connection
+from services.migrations import HOT_QUERIES
+from services.suggestions import suggestion_index
+
+logger = logging.getLogger(__name__)
+
+# Imported up front so no request pays for the import
+EAGER_MODULES = ('services.ai_service', 'openai')
+
+
+def compile_templates(app):
+    """Compile every template into the Jinja environment's cache"""
+    names = app.jinja_env.list_templates()
+    for name in names:
+        app.jinja_env.get_template(name)
+    return len(names)
+
+
+def import_modules(names=EAGER_MODULES):
+    """Import optional heavy modules, skipping any that are not installed"""
+    imported = []
+    for name in names:
+        try:
+            importlib.import_module(name)
+            imported.append(name)
+        except ImportError:
+            pass
+    return imported
+
+
+def prime_database(database):
+    """Run each hot query once and build the suggestion index
+
+    SQLite's statement cache lives on a connection, and connections must
+    not cross a fork, so what carries over to workers is the database
+    pages in the OS page cache and the built suggestion index.
+    """
+    conn = connection.connect_readonly(database)
+    try:
+        for sql, params in HOT_QUERIES.values():
+            conn.execute(sql, params).fetchall()
+        suggestion_index.rebuild(conn)
+    finally:
+        conn.close()
+
+
+def warm_up(app):
+    """Do the first request's lazy work ahead of time, before workers fork"""
+    started = time.perf_counter()
+    templates = compile_templates(app)
+    modules = import_modules()
+    prime_database(app.config['DATABASE'])
+    logger.info("Warmed up in %.0f ms: %d templates, modules %s",
+                (time.perf_counter() - started) * 1000, templates, ', '.join(modules) or 'none')
@@ -0,0 +1,190 @@
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from flask import current_app
+
+from services import connection
+from services.cache import response_cache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BATCH = int(os.getenv('WRITE_BATCH_MAX', 128))
+DEFAULT_MAX_WAIT = float(os.getenv('WRITE_BATCH_WAIT_MS', 2)) / 1000
+# How long a request waits for its write; a batch may spend up to the
+# connection's 5 s busy_timeout waiting on another process's lock
+DEFAULT_TIMEOUT = float(os.getenv('WRITE_TIMEOUT_MS', 10000)) / 1000
+
+_STOP = object()
+
+_queues = {}
+_queues_pid = None
+_queues_lock = threading.Lock()
+
+
+class WriteQueue:
+    """Single writer thread that group-commits event mutations
+
+    Handlers submit a function taking the writer's connection. Whatever
+    arrives within max_wait of the first queued write (up to max_batch)
+    runs in one transaction, each under its own savepoint, so one commit
+    and one fsync cover the whole batch while a failing write only undoes
+    itself. Functions must not commit or roll back.
+    """
+
+    def __init__(self, database, max_batch=DEFAULT_MAX_BATCH, max_wait=DEFAULT_MAX_WAIT):
+        self.database = database
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max_wait
+        self.batches = 0
+        self.writes = 0
+        self._stopping = False
+        self._closed = False
+        self._closing_lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='event-writer', daemon=True)
+        self._thread.start()
+
+    def submit(self, write, timeout=DEFAULT_TIMEOUT):
+        """Run write(conn) on the writer and return its result once committed
+
+        Exceptions raised by write, or by the commit, are re-raised here.
+        Raises RuntimeError at once after shutdown, and TimeoutError if the
+        write has not committed within timeout seconds.
+        """
+        future = Future()
+        with self._closing_lock:
+            # Nothing may be queued behind _STOP, where no thread reads it
+            if self._closed:
+                raise RuntimeError(f'Writer for {self.database} is shut down')
+            self._queue.put((write, future))
+        return future.result(timeout)
+
+    def execute(self, sql, params=()):
+        """Run one statement; returns (lastrowid, rowcount)"""
+        def write(conn):
+            cursor = conn.execute(sql, params)
+            return cursor.lastrowid, cursor.rowcount
+        return self.submit(write)
+
+    def shutdown(self, timeout=None):
+        """Finish the queued writes, close the connection and stop the thread"""
+        with self._closing_lock:
+            if not self._closed:
+                self._closed = True
+                self._queue.put((_STOP, None))
+        self._thread.join(timeout)
+
+    def stats(self):
+        return {
+            'batches': self.batches,
+            'writes': self.writes,
+            'average_batch': round(self.writes / self.batches, 2) if self.batches else 0.0,
+            'queued': self._queue.qsize()
+        }
+
+    def _collect(self):
+        batch = []
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                if not batch:
+                    item = self._queue.get()
+                elif remaining > 0:
+                    item = self._queue.get(timeout=remaining)
+                else:
+                    item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item[0] is _STOP:
+                self._stopping = True
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        conn = None
+        while not self._stopping:
+            batch = self._collect()
+            if not batch:
+                continue
+            try:
+                if conn is None:
+                    conn = connection.connect(self.database)
+                self._write_batch(conn, batch)
+            except Exception as e:
+                logger.exception("Write batch of %d failed", len(batch))
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                if conn is not None:
+                    conn.close()
+                    conn = None
+        if conn is not None:
+            conn.close()
+
+    def _write_batch(self, conn, batch):
+        outcomes = []
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            revision = _data_revision(conn)
+            for write, future in batch:
+                conn.execute('SAVEPOINT write_item')
+                try:
+                    result = write(conn)
+                    conn.execute('RELEASE write_item')
+                    outcomes.append((future, None, result))
+                except Exception as e:
+                    conn.execute('ROLLBACK TO write_item')
+                    conn.execute('RELEASE write_item')
+                    outcomes.append((future, e, None))
+            events_changed = _data_revision(conn) != revision
+            conn.commit()
+        except Exception:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+
+        self.batches += 1
+        self.writes += len(batch)
+        if events_changed:
+            # Job bookkeeping and other tables leave cached event payloads valid
+            response_cache.invalidate()
+        for future, error, result in outcomes:
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+
+
+def _data_revision(conn):
+    """The trigger-maintained counter every write to events bumps"""
+    return conn.execute('SELECT revision FROM data_revision WHERE id = 1').fetchone()[0]
+
+
+def get_write_queue(database=None):
+    """The process's writer for a database (the app's by default)"""
+    global _queues_pid
+    database = database or current_app.config['DATABASE']
+    with _queues_lock:
+        if _queues_pid != os.getpid():
+            # Writer threads do not survive a fork
+            _queues.clear()
+            _queues_pid = os.getpid()
+        write_queue = _queues.get(database)
+        if write_queue is None:
+            write_queue = _queues[database] = WriteQueue(database)
+        return write_queue
+
+
+def shutdown_write_queues():
+    """Stop every writer this process started, closing their connections"""
+    with _queues_lock:
+        write_queues = list(_queues.values()) if _queues_pid == os.getpid() else []
+        _queues.clear()
+    for write_queue in write_queues:
+        write_queue.shutdown()
@@ -120,7 +120,7 @@ class EventScheduler {
                  onclick="window.location.href='/events/edit/${event.id}'">
                 <div class="d-flex justify-content-between align-items-start">
                     <div class="flex-grow-1">
-                        <h6 class="mb-1 fw-bold">${this.highlightText(event.title, query)}</h6>
+                        <h6 class="mb-1 fw-bold">${event.title_html || this.highlightText(event.title, query)}</h6>
                         <small class="text-muted">
                             <i class="bi bi-calendar3 me-1"></i>${this.formatDate(event.date)}
                             ${event.location ? `<i class="bi bi-geo-alt ms-2 me-1"></i>${event.location}` : ''}
@@ -351,26 +351,33 @@ class EventScheduler {
 
 // Event-specific functions (global scope for template access)
 window.EventSchedulerApp = {
+    // Apply create/update/status/delete operations in one request and transaction
+    batchEvents: async function(operations, atomic = true) {
+        return app.makeApiCall('/events/api/batch', {
+            method: 'POST',
+            body: JSON.stringify({ operations, atomic })
+        });
+    },
+
     // Delete event function
-    deleteEvent: async function(eventId, eventTitle) {
+    deleteEvent: async function(eventId, eventTitle, redirectUrl) {
         if (!confirm(`Are you sure you want to delete "${eventTitle}"?`)) {
             return;
         }
 
         try {
-            await fetch(`/events/delete/${eventId}`, {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json',
-                }
-            });
+            await window.EventSchedulerApp.batchEvents([{ op: 'delete', id: Number(eventId) }]);
             
             // Show success message
             app.showToast(`Event "${eventTitle}" deleted successfully`, 'success');
             
             // Reload page or redirect
             setTimeout(() => {
-                window.location.reload();
+                if (redirectUrl) {
+                    window.location.href = redirectUrl;
+                } else {
+                    window.location.reload();
+                }
             }, 1000);
             
         } catch (error) {
@@ -379,6 +386,47 @@ window.EventSchedulerApp = {
         }
     },
 
+    // Delete button handler: the event comes from the button's data attributes
+    deleteEventSafe: function(button) {
+        window.EventSchedulerApp.deleteEvent(
+            button.getAttribute('data-event-id'),
+            button.getAttribute('data-event-title'),
+            button.getAttribute('data-redirect')
+        );
+    },
+
+    // Delete several events with one request and one page reload
+    deleteEvents: async function(eventIds) {
+        if (!eventIds.length || !confirm(`Are you sure you want to delete ${eventIds.length} events?`)) {
+            return;
+        }
+
+        try {
+            await window.EventSchedulerApp.batchEvents([{ op: 'delete', ids: eventIds }]);
+            app.showToast(`${eventIds.length} events deleted successfully`, 'success');
+            setTimeout(() => {
+                window.location.reload();
+            }, 1000);
+        } catch (error) {
+            console.error('Error deleting events:', error);
+            app.showToast('Failed to delete events', 'error');
+        }
+    },
+
+    // Change the status of several events at once
+    setEventsStatus: async function(eventIds, status) {
+        try {
+            await window.EventSchedulerApp.batchEvents([{ op: 'status', ids: eventIds, status }]);
+            app.showToast(`${eventIds.length} events marked ${status}`, 'success');
+            setTimeout(() => {
+                window.location.reload();
+            }, 1000);
+        } catch (error) {
+            console.error('Error updating events:', error);
+            app.showToast('Failed to update events', 'error');
+        }
+    },
+
     // View event details
     viewEventDetails: async function(eventId) {
         try {
@@ -442,6 +490,40 @@ window.EventSchedulerApp = {
         }
     },
 
+    // Long-poll an AI event job until it finishes, then report the outcome
+    watchAiJob: async function(jobId) {
+        let job;
+        try {
+            while (true) {
+                // The server holds each poll for at most a few seconds
+                const data = await app.makeApiCall(`/events/api/ai-jobs/${encodeURIComponent(jobId)}?wait=5`);
+                job = data.job;
+                if (job.status !== 'queued' && job.status !== 'running') {
+                    break;
+                }
+                await new Promise(resolve => setTimeout(resolve, 1000));
+            }
+        } catch (error) {
+            return;
+        }
+        
+        const url = new URL(window.location.href);
+        url.searchParams.delete('ai_job');
+        window.history.replaceState(null, '', url);
+        
+        // The message can echo the submitted text; showToast renders HTML
+        const message = document.createElement('span');
+        message.textContent = job.message || 'Unknown error';
+        
+        if (job.status === 'done') {
+            app.showToast('Event created successfully using AI!', 'success');
+            setTimeout(() => window.location.reload(), 1000);
+        } else if (job.status === 'needs_clarification') {
+            app.showToast(`Need clarification: ${message.innerHTML}`, 'warning');
+        } else {
+            app.showToast(`AI parsing failed: ${message.innerHTML}`, 'error');
+        }
+    },
     // Enhance description with AI
     enhanceDescription: async function() {
         const titleInput = document.getElementById('title');
@@ -518,9 +600,16 @@ document.addEventListener('DOMContentLoaded', () => {
     
     // Make functions globally available for templates
     window.deleteEvent = window.EventSchedulerApp.deleteEvent;
+    window.deleteEventSafe = window.EventSchedulerApp.deleteEventSafe;
     window.viewEventDetails = window.EventSchedulerApp.viewEventDetails;
     window.enhanceDescription = window.EventSchedulerApp.enhanceDescription;
     
+    // Follow an AI event job queued by the add form
+    const aiJob = new URLSearchParams(window.location.search).get('ai_job');
+    if (aiJob) {
+        window.EventSchedulerApp.watchAiJob(aiJob);
+    }
+    
     // Add fade-in animation to main content
     document.querySelector('main').classList.add('fade-in');
     
@@ -0,0 +1,114 @@
+import re
+
+import pytest
+
+from benchmarks.datagen import seed_database
+from services import ai_jobs, connection, migrations
+from services.cache import response_cache
+from services.slowlog import normalize_sql
+from services.suggestions import suggestion_index
+from services.writer import shutdown_write_queues
+
+# Pages and APIs covering every filter and cursor combination the routes build
+ROUTES = (
+    '/',
+    '/events/',
+    '/events/?status=upcoming',
+    '/events/api/1',
+    '/events/api/stats',
+    '/events/export.csv',
+    '/events/export.csv?status=upcoming',
+    '/events/export.ndjson?date_from=2025-01-01&date_to=2025-06-30',
+    '/search/?q=meeting',
+    '/search/?q=meeting&status=upcoming&date_from=2025-01-01&date_to=2025-06-30',
+    '/search/?status=upcoming',
+    '/search/?date_from=2025-01-01&date_to=2025-06-30',
+    '/search/?status=upcoming&date_from=2025-01-01&date_to=2025-06-30',
+    '/search/api/quick-search?q=meet',
+    '/search/api/suggestions?q=co',
+)
+
+# Statements that read the whole table on purpose
+FULL_SCANS = {
+    'SELECT title, location FROM events',  # suggestion index rebuild
+}
+
+_READS_EVENTS_RE = re.compile(r'^\s*SELECT\b.*\b(FROM|JOIN)\s+events\b', re.IGNORECASE | re.DOTALL)
+
+
+@pytest.fixture
+def route_statements(tmp_path, monkeypatch):
+    """Every SELECT on events the routes run against a seeded database,
+    keyed by normalized shape"""
+    from app import app
+
+    database = str(tmp_path / 'events.db')
+    seed_database(database, 2000, seed=1)
+    statements = []
+
+    def traced(opener):
+        def open_connection(*args, **kwargs):
+            conn = opener(*args, **kwargs)
+            conn.set_trace_callback(statements.append)
+            return conn
+        return open_connection
+
+    monkeypatch.setattr(connection, 'connect', traced(connection.connect))
+    monkeypatch.setattr(connection, 'connect_readonly', traced(connection.connect_readonly))
+    monkeypatch.setitem(app.config, 'DATABASE', database)
+    suggestion_index.reset()
+    response_cache.invalidate()
+    try:
+        client = app.test_client()
+        for url in ROUTES:
+            response = client.get(url)
+            response.get_data()
+            assert response.status_code == 200, url
+        for status in ('', 'upcoming'):
+            page = client.get(f'/events/api?status={status}').get_json()
+            page = client.get(f"/events/api?status={status}&cursor={page['next_cursor']}").get_json()
+            client.get(f"/events/api?status={status}&cursor={page['prev_cursor']}")
+    finally:
+        connection.close_thread_connections()
+        ai_jobs.stop_workers()
+        shutdown_write_queues()
+
+    shapes = {}
+    for sql in statements:
+        if _READS_EVENTS_RE.match(sql):
+            shapes.setdefault(normalize_sql(sql), sql)
+    return database, shapes
+
+
+def test_hot_queries_use_indexes(tmp_path):
+    conn = connection.connect(str(tmp_path / 'events.db'))
+    try:
+        assert migrations.migrate(conn) == len(migrations.MIGRATIONS)
+        assert migrations.unindexed_queries(conn) == {}
+    finally:
+        conn.close()
+
+
+def test_route_queries_use_indexes(route_statements):
+    database, shapes = route_statements
+    conn = connection.connect(database)
+    try:
+        problems = {}
+        for shape, sql in shapes.items():
+            if shape in FULL_SCANS:
+                continue
+            plan = migrations.query_plan(conn, sql)
+            if migrations.is_unindexed(plan):
+                problems[shape] = plan
+    finally:
+        conn.close()
+    assert problems == {}
+
+
+def test_hot_queries_match_route_queries(route_statements):
+    _, shapes = route_statements
+    # Full-text joins reach events by rowid from the FTS index
+    ran = {shape for shape in shapes if shape not in FULL_SCANS and 'events_fts' not in shape}
+    hot = {normalize_sql(sql) for sql, _ in migrations.HOT_QUERIES.values()}
+    assert sorted(hot - ran) == [], 'HOT_QUERIES lists queries no route runs'
+    assert sorted(ran - hot) == [], 'routes run queries missing from HOT_QUERIES'
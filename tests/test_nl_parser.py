@@ -0,0 +1,95 @@
+from datetime import datetime
+
+import pytest
+
+from services.nl_parser import parse_event_text, tokenize
+
+# Every expectation is relative to this clock (a Wednesday morning)
+GOLDEN_NOW = datetime(2024, 6, 19, 10, 30)
+
+# (input, (title, 'YYYY-MM-DD HH:MM', location))
+CORPUS = [
+    ("Team meeting tomorrow at 3pm in conference room A",
+     ("Team meeting", "2024-06-20 15:00", "conference room A")),
+    ("Lunch with Sarah at Cafe Roma on Friday at 1pm",
+     ("Lunch with Sarah", "2024-06-21 13:00", "Cafe Roma")),
+    ("Dinner at 7 in Seattle", ("Dinner", "2024-06-19 19:00", "Seattle")),
+    ("Saturday hike at Mount Si", ("hike", "2024-06-22 09:00", "Mount Si")),
+    ("Seattle trip next Monday", ("Seattle trip", "2024-06-24 09:00", None)),
+    ("Yoga today", ("Yoga", "2024-06-19 11:00", None)),
+    ("Call mom today at 9am", ("Call mom", "2024-06-19 09:00", None)),
+    ("Standup at 14:30", ("Standup", "2024-06-19 14:30", None)),
+    ("Party tonight @ Joe's place", ("Party", "2024-06-19 19:00", "Joe's place")),
+    ("Review on 2024-07-01 at 10:30 am", ("Review", "2024-07-01 10:30", None)),
+    ("Dentist next week", ("Dentist", "2024-06-26 09:00", None)),
+    ("Concert next Friday at 8 p.m. at the Paramount",
+     ("Concert", "2024-06-21 20:00", "the Paramount")),
+    ("Lunch at 1pm", ("Lunch", "2024-06-19 13:00", None)),
+    ("Breakfast at 8am", ("Breakfast", "2024-06-20 08:00", None)),
+    ("Lunch at noon", ("Lunch", "2024-06-19 12:00", None)),
+    ("Book club Thursday at 6:30pm at Elliott Bay Books",
+     ("Book club", "2024-06-20 18:30", "Elliott Bay Books")),
+    ("Gym wednesday", ("Gym", "2024-06-26 09:00", None)),
+    ("Board meeting next tuesday at 10am in Room 4",
+     ("Board meeting", "2024-06-25 10:00", "Room 4")),
+    ("Sprint planning tomorrow", ("Sprint planning", "2024-06-20 09:00", None)),
+    ("Flight to Boston on Sunday at 6:15 am",
+     ("Flight to Boston", "2024-06-23 06:15", None)),
+    ("Birthday party", ("Birthday party", "2024-06-20 09:00", None)),
+    ("Pick up dry cleaning at 5", ("Pick up dry cleaning", "2024-06-19 17:00", None)),
+    ("Release at midnight", ("Release", "2024-06-20 00:00", None)),
+    ("Coffee tmrw at 10:00 at Starbucks", ("Coffee", "2024-06-20 10:00", "Starbucks")),
+    ("Offsite next Thurs in Portland, OR", ("Offsite", "2024-06-20 09:00", "Portland, OR")),
+    ("Planning for next quarter", ("Planning for next quarter", "2024-06-20 09:00", None)),
+    ("Next steps meeting tomorrow", ("Next steps meeting", "2024-06-20 09:00", None)),
+    ("Dinner at 42 Main St", ("Dinner", "2024-06-20 09:00", "42 Main St")),
+]
+
+# (input, clarification message) for inputs the parser must not guess at
+CLARIFICATIONS = [
+    ("tomorrow at 3pm", "Please provide a clear event title"),
+    ("Meeting 25:00", "Please provide a valid time"),
+    ("Standup at 7:75pm", "Please provide a valid time"),
+    ("Meeting at 99:99", "Please provide a valid time"),
+    ("Lunch at 13pm", "Please provide a valid time"),
+    ("Meeting at 0am", "Please provide a valid time"),
+    ("   ", "Please describe your event"),
+]
+
+
+@pytest.mark.parametrize('text, expected', CORPUS, ids=[text for text, _ in CORPUS])
+def test_parses_golden_corpus(text, expected):
+    result = parse_event_text(text, now=GOLDEN_NOW)
+    assert result['success'], result
+    data = result['event_data']
+    assert (data['title'], data['date'].strftime('%Y-%m-%d %H:%M'), data['location']) == expected
+
+
+@pytest.mark.parametrize('text, message', CLARIFICATIONS, ids=[text for text, _ in CLARIFICATIONS])
+def test_asks_for_clarification(text, message):
+    result = parse_event_text(text, now=GOLDEN_NOW)
+    assert not result['success']
+    assert result['needs_clarification']
+    assert result['clarification_message'] == message
+
+
+@pytest.mark.parametrize('text, token', [
+    ("Meeting 25:00", "25:00"),
+    ("Standup at 7:75pm", "7:75pm"),
+    ("Lunch at 13pm", "13pm"),
+])
+def test_out_of_range_time_is_reported(text, token):
+    tokens = tokenize(text)
+    assert tokens['invalid_time'] == token
+    assert tokens['time'] is None
+
+
+@pytest.mark.parametrize('text, title', [
+    ("Planning for next quarter", "Planning for next quarter"),
+    ("Next steps sync", "Next steps sync"),
+    ("Review next month", "Review next month"),
+])
+def test_next_only_dates_weeks_and_weekdays(text, title):
+    tokens = tokenize(text)
+    assert tokens['title'] == title
+    assert tokens['date'] is None and tokens['day_offset'] is None and tokens['weekday'] is None
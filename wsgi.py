@@ -0,0 +1,19 @@
+"""WSGI entry point for production servers
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+With preload_app (see gunicorn.conf.py) this module is imported once in
+the gunicorn master, so migrations run once per deploy and the warm-up
+is inherited by every forked worker.
+"""
+import gc
+
+from app import app, init_database
+from services.warmup import warm_up
+
+init_database()
+warm_up(app)
+
+# Keep the warmed objects out of the collector so workers don't copy
+# their pages on the first collection after the fork
+gc.freeze()